@@ -0,0 +1,64 @@
+"""Switch JSON columns to JSONB and add GIN indexes on tags
+
+Revision ID: 005_jsonb_columns_and_gin_indexes
+Revises: 004_add_advanced_task_features
+Create Date: 2024-01-15 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '005_jsonb_columns_and_gin_indexes'
+down_revision = '004_add_advanced_task_features'
+branch_labels = None
+depends_on = None
+
+
+JSON_COLUMNS = [
+    ('tasks', 'tags'),
+    ('task_templates', 'tags'),
+    ('task_templates', 'template_data'),
+    ('notifications', 'metadata'),
+]
+
+
+def upgrade():
+    # Convert json -> jsonb (binary, indexable, supports @> containment)
+    for table, column in JSON_COLUMNS:
+        op.alter_column(
+            table, column,
+            type_=postgresql.JSONB(),
+            existing_type=sa.JSON(),
+            existing_nullable=True,
+            postgresql_using=f'{column}::jsonb',
+        )
+
+    # Build GIN indexes without locking writes on the tables
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_tasks_tags_gin', 'tasks', ['tags'],
+            postgresql_using='gin', postgresql_ops={'tags': 'jsonb_path_ops'},
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_task_templates_tags_gin', 'task_templates', ['tags'],
+            postgresql_using='gin', postgresql_ops={'tags': 'jsonb_path_ops'},
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_task_templates_tags_gin', table_name='task_templates', postgresql_concurrently=True)
+        op.drop_index('ix_tasks_tags_gin', table_name='tasks', postgresql_concurrently=True)
+
+    for table, column in JSON_COLUMNS:
+        op.alter_column(
+            table, column,
+            type_=sa.JSON(),
+            existing_type=postgresql.JSONB(),
+            existing_nullable=True,
+            postgresql_using=f'{column}::json',
+        )
@@ -0,0 +1,68 @@
+"""Add composite indexes for the task list and notification poller queries
+
+Revision ID: 006_add_composite_query_indexes
+Revises: 005_jsonb_columns_and_gin_indexes
+Create Date: 2024-01-15 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006_add_composite_query_indexes'
+down_revision = '005_jsonb_columns_and_gin_indexes'
+branch_labels = None
+depends_on = None
+
+
+# Plain indexes on primary keys duplicate the implicit PK index
+REDUNDANT_PK_INDEXES = [
+    ('ix_users_id', 'users'),
+    ('ix_tasks_id', 'tasks'),
+    ('ix_categories_id', 'categories'),
+    ('ix_task_files_id', 'task_files'),
+    ('ix_notifications_id', 'notifications'),
+    ('ix_notification_preferences_id', 'notification_preferences'),
+    ('ix_email_templates_id', 'email_templates'),
+    ('ix_task_dependencies_id', 'task_dependencies'),
+    ('ix_task_templates_id', 'task_templates'),
+]
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_tasks_user_status_due', 'tasks', ['user_id', 'status', 'due_date'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_tasks_user_created_desc', 'tasks', ['user_id', sa.text('created_at DESC')],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_tasks_user_category', 'tasks', ['user_id', 'category_id'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_notifications_user_status_created', 'notifications', ['user_id', 'status', 'created_at'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_task_files_task', 'task_files', ['task_id'],
+            postgresql_concurrently=True,
+        )
+
+        for index_name, table in REDUNDANT_PK_INDEXES:
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {index_name}')
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for index_name, table in REDUNDANT_PK_INDEXES:
+            op.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} ON {table} (id)')
+
+        op.drop_index('ix_task_files_task', table_name='task_files', postgresql_concurrently=True)
+        op.drop_index('ix_notifications_user_status_created', table_name='notifications', postgresql_concurrently=True)
+        op.drop_index('ix_tasks_user_category', table_name='tasks', postgresql_concurrently=True)
+        op.drop_index('ix_tasks_user_created_desc', table_name='tasks', postgresql_concurrently=True)
+        op.drop_index('ix_tasks_user_status_due', table_name='tasks', postgresql_concurrently=True)
@@ -0,0 +1,59 @@
+"""Store enum columns as varchar instead of native PostgreSQL enum types
+
+Revision ID: 007_enum_columns_to_varchar
+Revises: 006_add_composite_query_indexes
+Create Date: 2024-01-15 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007_enum_columns_to_varchar'
+down_revision = '006_add_composite_query_indexes'
+branch_labels = None
+depends_on = None
+
+
+# (table, column, enum type name, enum values)
+ENUM_COLUMNS = [
+    ('tasks', 'status', 'taskstatus', ('todo', 'in_progress', 'done')),
+    ('tasks', 'priority', 'taskpriority', ('low', 'medium', 'high', 'urgent')),
+    ('task_templates', 'priority', 'taskpriority', ('low', 'medium', 'high', 'urgent')),
+    ('notifications', 'type', 'notificationtype', (
+        'task_reminder', 'due_date_alert', 'task_completed',
+        'welcome', 'category_created', 'file_uploaded',
+    )),
+    ('notifications', 'status', 'notificationstatus', ('pending', 'sent', 'failed', 'bounced')),
+    ('email_templates', 'template_type', 'notificationtype', (
+        'task_reminder', 'due_date_alert', 'task_completed',
+        'welcome', 'category_created', 'file_uploaded',
+    )),
+]
+
+
+def upgrade():
+    # lower() normalises labels created from enum member names (TODO -> todo)
+    for table, column, _, _ in ENUM_COLUMNS:
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN {column} DROP DEFAULT')
+        op.alter_column(
+            table, column,
+            type_=sa.String(length=20),
+            existing_nullable=False,
+            postgresql_using=f'lower({column}::text)',
+        )
+
+    for type_name in {type_name for _, _, type_name, _ in ENUM_COLUMNS}:
+        op.execute(f'DROP TYPE IF EXISTS {type_name}')
+
+
+def downgrade():
+    created = set()
+    for table, column, type_name, values in ENUM_COLUMNS:
+        if type_name not in created:
+            labels = ', '.join(f"'{value}'" for value in values)
+            op.execute(f'CREATE TYPE {type_name} AS ENUM ({labels})')
+            created.add(type_name)
+        op.execute(
+            f'ALTER TABLE {table} ALTER COLUMN {column} TYPE {type_name} USING {column}::{type_name}'
+        )
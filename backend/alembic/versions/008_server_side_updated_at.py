@@ -0,0 +1,46 @@
+"""Make updated_at server-defaulted and NOT NULL
+
+Revision ID: 008_server_side_updated_at
+Revises: 007_enum_columns_to_varchar
+Create Date: 2024-01-15 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '008_server_side_updated_at'
+down_revision = '007_enum_columns_to_varchar'
+branch_labels = None
+depends_on = None
+
+
+TABLES = [
+    'tasks',
+    'task_templates',
+    'notifications',
+    'notification_preferences',
+    'email_templates',
+]
+
+
+def upgrade():
+    for table in TABLES:
+        # Backfill rows that were never updated before adding the NOT NULL constraint
+        op.execute(f'UPDATE {table} SET updated_at = COALESCE(created_at, now()) WHERE updated_at IS NULL')
+        op.alter_column(
+            table, 'updated_at',
+            existing_type=sa.DateTime(timezone=True),
+            server_default=sa.text('now()'),
+            nullable=False,
+        )
+
+
+def downgrade():
+    for table in TABLES:
+        op.alter_column(
+            table, 'updated_at',
+            existing_type=sa.DateTime(timezone=True),
+            server_default=None,
+            nullable=True,
+        )
@@ -0,0 +1,31 @@
+"""Add unique constraint on task dependency pairs
+
+Revision ID: 009_unique_task_dependency_pair
+Revises: 008_server_side_updated_at
+Create Date: 2024-01-15 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '009_unique_task_dependency_pair'
+down_revision = '008_server_side_updated_at'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keep the oldest row of any duplicated pair before adding the constraint
+    op.execute("""
+        DELETE FROM task_dependencies a
+        USING task_dependencies b
+        WHERE a.task_id = b.task_id
+          AND a.depends_on_task_id = b.depends_on_task_id
+          AND a.id > b.id
+    """)
+    op.create_unique_constraint('uq_task_dep', 'task_dependencies', ['task_id', 'depends_on_task_id'])
+
+
+def downgrade():
+    op.drop_constraint('uq_task_dep', 'task_dependencies', type_='unique')
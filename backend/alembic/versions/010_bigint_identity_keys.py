@@ -0,0 +1,53 @@
+"""Use BIGINT identity primary keys for tasks, notifications and task files
+
+Revision ID: 010_bigint_identity_keys
+Revises: 009_unique_task_dependency_pair
+Create Date: 2024-01-15 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '010_bigint_identity_keys'
+down_revision = '009_unique_task_dependency_pair'
+branch_labels = None
+depends_on = None
+
+
+IDENTITY_TABLES = ['tasks', 'notifications', 'task_files']
+
+# Columns referencing tasks.id
+TASK_FK_COLUMNS = [
+    ('tasks', 'parent_task_id'),
+    ('task_dependencies', 'task_id'),
+    ('task_dependencies', 'depends_on_task_id'),
+    ('task_files', 'task_id'),
+]
+
+
+def upgrade():
+    for table in IDENTITY_TABLES:
+        op.alter_column(table, 'id', type_=sa.BigInteger(), existing_type=sa.Integer(), existing_nullable=False)
+        # Replace the SERIAL sequence with an identity that continues after the current max id
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN id DROP DEFAULT')
+        op.execute(f'DROP SEQUENCE IF EXISTS {table}_id_seq')
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY (CACHE 50)')
+        op.execute(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE(MAX(id), 0) + 1, false) FROM {table}"
+        )
+
+    for table, column in TASK_FK_COLUMNS:
+        op.alter_column(table, column, type_=sa.BigInteger(), existing_type=sa.Integer())
+
+
+def downgrade():
+    for table, column in TASK_FK_COLUMNS:
+        op.alter_column(table, column, type_=sa.Integer(), existing_type=sa.BigInteger())
+
+    for table in IDENTITY_TABLES:
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN id DROP IDENTITY IF EXISTS')
+        op.execute(f'CREATE SEQUENCE {table}_id_seq OWNED BY {table}.id')
+        op.execute(f"SELECT setval('{table}_id_seq', COALESCE(MAX(id), 0) + 1, false) FROM {table}")
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN id SET DEFAULT nextval('{table}_id_seq')")
+        op.alter_column(table, 'id', type_=sa.Integer(), existing_type=sa.BigInteger(), existing_nullable=False)
@@ -0,0 +1,59 @@
+"""Replace task file S3 key/bucket strings with a bucket id and object uuid
+
+New uploads are stored at ``tasks/{task_id}/{uuid}``. Existing objects are not
+moved: their old key is kept in ``legacy_s3_key``, which takes precedence when
+building the key, and their uuid is parsed out of it where present (NULL otherwise).
+
+Revision ID: 011_task_file_object_uuid
+Revises: 010_bigint_identity_keys
+Create Date: 2024-01-15 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '011_task_file_object_uuid'
+down_revision = '010_bigint_identity_keys'
+branch_labels = None
+depends_on = None
+
+
+UUID_PATTERN = '[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}'
+
+
+def upgrade():
+    op.add_column('task_files', sa.Column('s3_bucket_id', sa.SmallInteger(), nullable=True))
+    op.add_column('task_files', sa.Column('s3_object_uuid', postgresql.UUID(as_uuid=True), nullable=True))
+    op.add_column('task_files', sa.Column('legacy_s3_key', sa.String(length=500), nullable=True))
+
+    # Only one bucket has ever been used (id 1 = taskflow-files)
+    op.execute(
+        f"UPDATE task_files SET s3_bucket_id = 1, legacy_s3_key = s3_key, "
+        f"s3_object_uuid = substring(s3_key from '{UUID_PATTERN}')::uuid"
+    )
+
+    op.alter_column('task_files', 's3_bucket_id', nullable=False)
+    op.create_unique_constraint('uq_task_files_s3_object_uuid', 'task_files', ['s3_object_uuid'])
+
+    op.drop_column('task_files', 's3_key')
+    op.drop_column('task_files', 's3_bucket')
+
+
+def downgrade():
+    op.add_column('task_files', sa.Column('s3_key', sa.String(length=500), nullable=True))
+    op.add_column('task_files', sa.Column('s3_bucket', sa.String(length=100), nullable=True))
+
+    op.execute(
+        "UPDATE task_files SET s3_bucket = 'taskflow-files', "
+        "s3_key = COALESCE(legacy_s3_key, 'tasks/' || task_id || '/' || s3_object_uuid)"
+    )
+
+    op.alter_column('task_files', 's3_key', nullable=False)
+    op.alter_column('task_files', 's3_bucket', nullable=False)
+
+    op.drop_constraint('uq_task_files_s3_object_uuid', 'task_files', type_='unique')
+    op.drop_column('task_files', 'legacy_s3_key')
+    op.drop_column('task_files', 's3_object_uuid')
+    op.drop_column('task_files', 's3_bucket_id')
@@ -0,0 +1,119 @@
+"""Partition notifications by month on created_at
+
+The table is rebuilt as a RANGE-partitioned table with one partition per month
+(notifications_YYYY_MM) from the oldest row through next month. The daily
+cleanup task keeps creating upcoming partitions and drops expired ones.
+
+Revision ID: 012_partition_notifications_by_month
+Revises: 011_task_file_object_uuid
+Create Date: 2024-01-15 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '012_partition_notifications_by_month'
+down_revision = '011_task_file_object_uuid'
+branch_labels = None
+depends_on = None
+
+
+COLUMNS = (
+    'id, user_id, type, title, message, status, email_sent, email_sent_at, '
+    'metadata, created_at, updated_at'
+)
+
+
+def upgrade():
+    op.rename_table('notifications', 'notifications_old')
+    op.execute('ALTER INDEX ix_notifications_user_status_created RENAME TO ix_notifications_old_user_status_created')
+
+    op.execute("""
+        CREATE TABLE notifications (
+            id BIGINT GENERATED BY DEFAULT AS IDENTITY (CACHE 50),
+            user_id INTEGER NOT NULL REFERENCES users (id),
+            type VARCHAR(20) NOT NULL,
+            title VARCHAR(255) NOT NULL,
+            message TEXT NOT NULL,
+            status VARCHAR(20) NOT NULL,
+            email_sent BOOLEAN,
+            email_sent_at TIMESTAMP WITH TIME ZONE,
+            metadata JSONB,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+
+    op.execute("""
+        DO $$
+        DECLARE
+            month date;
+        BEGIN
+            FOR month IN
+                SELECT generate_series(
+                    date_trunc('month', COALESCE(MIN(created_at), now())),
+                    date_trunc('month', now()) + interval '1 month',
+                    interval '1 month'
+                )::date
+                FROM notifications_old
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF notifications FOR VALUES FROM (%L) TO (%L)',
+                    'notifications_' || to_char(month, 'YYYY_MM'),
+                    month,
+                    (month + interval '1 month')::date
+                );
+            END LOOP;
+        END $$
+    """)
+
+    # Created on the parent, so every partition gets its own copy
+    op.create_index(
+        'ix_notifications_user_status_created', 'notifications', ['user_id', 'status', 'created_at'],
+    )
+
+    op.execute(
+        f'INSERT INTO notifications ({COLUMNS}) '
+        f'SELECT id, user_id, type, title, message, status, email_sent, email_sent_at, '
+        f'metadata, COALESCE(created_at, updated_at), updated_at FROM notifications_old'
+    )
+    op.execute(
+        "SELECT setval(pg_get_serial_sequence('notifications', 'id'), COALESCE(MAX(id), 0) + 1, false) "
+        "FROM notifications"
+    )
+
+    op.drop_table('notifications_old')
+
+
+def downgrade():
+    op.rename_table('notifications', 'notifications_partitioned')
+    op.execute('ALTER INDEX ix_notifications_user_status_created RENAME TO ix_notifications_partitioned_user_status_created')
+
+    op.execute("""
+        CREATE TABLE notifications (
+            id BIGINT GENERATED BY DEFAULT AS IDENTITY (CACHE 50) PRIMARY KEY,
+            user_id INTEGER NOT NULL REFERENCES users (id),
+            type VARCHAR(20) NOT NULL,
+            title VARCHAR(255) NOT NULL,
+            message TEXT NOT NULL,
+            status VARCHAR(20) NOT NULL,
+            email_sent BOOLEAN,
+            email_sent_at TIMESTAMP WITH TIME ZONE,
+            metadata JSONB,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+            updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+        )
+    """)
+    op.execute(f'INSERT INTO notifications ({COLUMNS}) SELECT {COLUMNS} FROM notifications_partitioned')
+    op.execute(
+        "SELECT setval(pg_get_serial_sequence('notifications', 'id'), COALESCE(MAX(id), 0) + 1, false) "
+        "FROM notifications"
+    )
+
+    # Dropping the parent drops every partition with it
+    op.drop_table('notifications_partitioned')
+    op.create_index(
+        'ix_notifications_user_status_created', 'notifications', ['user_id', 'status', 'created_at'],
+    )
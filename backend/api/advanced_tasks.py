@@ -1,8 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func, desc, asc
+from sqlalchemy.orm import Session, selectinload, joinedload, raiseload
+from sqlalchemy import and_, or_, func, desc, asc, update, select, insert, any_, bindparam, String
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from typing import List, Optional, Dict, Any
 from datetime import datetime
+from enum import Enum
 
 from core.database import get_db
 from api.auth import get_current_user
@@ -12,12 +15,50 @@ from schemas.task import (
     TaskDependencyCreate, TaskDependencyResponse,
     TaskTemplateCreate, TaskTemplateUpdate, TaskTemplateResponse,
     CreateTaskFromTemplate, BulkTaskOperation, TaskSearchRequest,
-    TaskWithSubtasks, TaskListResponse
+    TaskWithSubtasks, TaskListResponse, TASK_RESPONSE_LIST_ADAPTER
 )
 import logging
 
 logger = logging.getLogger(__name__)
 
+
+def _get_task_with_subtasks(db: Session, task_id: int, user_id: int) -> Optional[Task]:
+    """Load a task with everything TaskWithSubtasks serializes, one IN (...) query per relationship"""
+    return db.execute(
+        select(Task)
+        .where(Task.id == task_id, Task.user_id == user_id)
+        .options(
+            selectinload(Task.category),
+            selectinload(Task.subtasks.and_(Task.user_id == user_id))
+            .selectinload(Task.category),
+            selectinload(Task.dependencies),
+            selectinload(Task.dependents),
+            raiseload("*"),
+        )
+    ).scalar_one_or_none()
+
+
+# INSERT constructs with ON CONFLICT DO NOTHING support, by dialect (SQLite runs the tests)
+_CONFLICT_INSERTS = {"postgresql": pg_insert, "sqlite": sqlite_insert}
+
+
+def _insert_ignoring_conflicts(db: Session, model, index_elements: List[str]):
+    """INSERT ... ON CONFLICT DO NOTHING; RETURNING yields no row for a skipped conflict"""
+    dialect_insert = _CONFLICT_INSERTS.get(db.get_bind().dialect.name)
+    if dialect_insert is None:
+        # Other dialects surface the conflict as an IntegrityError instead
+        return insert(model)
+    return dialect_insert(model).on_conflict_do_nothing(index_elements=index_elements)
+
+
+def _matches_any(db: Session, column, name: str, members: List[Enum]):
+    """column = ANY(:name) binding one text[] on PostgreSQL; IN (...) on other dialects"""
+    values = [member.value for member in members]
+    if db.get_bind().dialect.name == "postgresql":
+        return column == any_(bindparam(name, values, type_=ARRAY(String)))
+    return column.in_(values)
+
+
 router = APIRouter()
 
 
@@ -45,25 +86,23 @@ async def create_task_dependency(
         if dependency.task_id == dependency.depends_on_task_id:
             raise HTTPException(status_code=400, detail="Task cannot depend on itself")
         
-        # Check if dependency already exists
-        existing = db.query(TaskDependency).filter(
-            and_(
-                TaskDependency.task_id == dependency.task_id,
-                TaskDependency.depends_on_task_id == dependency.depends_on_task_id
-            )
+        # Create dependency; an existing pair hits uq_task_dep and returns no row
+        db_dependency = db.scalars(
+            _insert_ignoring_conflicts(db, TaskDependency, ["task_id", "depends_on_task_id"])
+            .values(**dependency.model_dump())
+            .returning(TaskDependency)
         ).first()
         
-        if existing:
+        if db_dependency is None:
             raise HTTPException(status_code=400, detail="Dependency already exists")
         
-        # Create dependency
-        db_dependency = TaskDependency(**dependency.dict())
-        db.add(db_dependency)
         db.commit()
-        db.refresh(db_dependency)
         
         return db_dependency
         
+    except HTTPException:
+        db.rollback()
+        raise
     except Exception as e:
         logger.error(f"Error creating task dependency: {str(e)}")
         db.rollback()
@@ -298,14 +337,14 @@ async def create_task_from_template(
         
         db_task = Task(**task_dict, user_id=current_user.id)
         db.add(db_task)
-        db.commit()
-        db.refresh(db_task)
         
         # Update template usage count
         template.usage_count += 1
+        db.flush()
+        task_id = db_task.id
         db.commit()
         
-        return db_task
+        return _get_task_with_subtasks(db, task_id, current_user.id)
         
     except Exception as e:
         logger.error(f"Error creating task from template: {str(e)}")
@@ -322,34 +361,12 @@ async def get_task_with_subtasks(
 ):
     """Get a task with its subtasks and dependencies"""
     try:
-        task = db.query(Task).filter(
-            and_(Task.id == task_id, Task.user_id == current_user.id)
-        ).first()
+        task = _get_task_with_subtasks(db, task_id, current_user.id)
         
         if not task:
             raise HTTPException(status_code=404, detail="Task not found")
         
-        # Get subtasks
-        subtasks = db.query(Task).filter(
-            and_(Task.parent_task_id == task_id, Task.user_id == current_user.id)
-        ).all()
-        
-        # Get dependencies
-        dependencies = db.query(TaskDependency).filter(
-            TaskDependency.task_id == task_id
-        ).all()
-        
-        # Get dependents
-        dependents = db.query(TaskDependency).filter(
-            TaskDependency.depends_on_task_id == task_id
-        ).all()
-        
-        return TaskWithSubtasks(
-            **task.__dict__,
-            subtasks=subtasks,
-            dependencies=dependencies,
-            dependents=dependents
-        )
+        return TaskWithSubtasks.model_validate(task)
         
     except Exception as e:
         logger.error(f"Error getting task with subtasks: {str(e)}")
@@ -372,30 +389,23 @@ async def bulk_task_operation(
         if len(tasks) != len(operation.task_ids):
             raise HTTPException(status_code=404, detail="Some tasks not found")
         
-        updated_count = 0
+        values = None
         
         if operation.operation == "delete":
             for task in tasks:
                 db.delete(task)
-            updated_count = len(tasks)
             
         elif operation.operation == "update_status":
             status = operation.data.get("status")
             if not status:
                 raise HTTPException(status_code=400, detail="Status is required")
-            
-            for task in tasks:
-                task.status = status
-            updated_count = len(tasks)
+            values = {"status": status}
             
         elif operation.operation == "update_priority":
             priority = operation.data.get("priority")
             if not priority:
                 raise HTTPException(status_code=400, detail="Priority is required")
-            
-            for task in tasks:
-                task.priority = priority
-            updated_count = len(tasks)
+            values = {"priority": priority}
             
         elif operation.operation == "assign_category":
             category_id = operation.data.get("category_id")
@@ -406,14 +416,20 @@ async def bulk_task_operation(
                 ).first()
                 if not category:
                     raise HTTPException(status_code=404, detail="Category not found")
-            
-            for task in tasks:
-                task.category_id = category_id
-            updated_count = len(tasks)
+            values = {"category_id": category_id}
             
         else:
             raise HTTPException(status_code=400, detail="Invalid operation")
         
+        if values is not None:
+            # One set-based UPDATE instead of a per-row flush; updated_at comes from onupdate
+            db.execute(
+                update(Task)
+                .where(Task.id.in_(operation.task_ids), Task.user_id == current_user.id)
+                .values(**values)
+            )
+        updated_count = len(tasks)
+        
         db.commit()
         
         return {
@@ -436,7 +452,7 @@ async def search_tasks(
 ):
     """Advanced task search with multiple filters"""
     try:
-        query = db.query(Task).filter(Task.user_id == current_user.id)
+        query = db.query(Task).options(joinedload(Task.category)).filter(Task.user_id == current_user.id)
         
         # Text search
         if search_request.query:
@@ -447,22 +463,21 @@ async def search_tasks(
                 )
             )
         
-        # Status filter
+        # Status/priority filters bind one text[] (= ANY) on PostgreSQL so the statement
+        # shape doesn't change with the number of values selected
         if search_request.status:
-            query = query.filter(Task.status.in_(search_request.status))
+            query = query.filter(_matches_any(db, Task.status, "statuses", search_request.status))
         
-        # Priority filter
         if search_request.priority:
-            query = query.filter(Task.priority.in_(search_request.priority))
+            query = query.filter(_matches_any(db, Task.priority, "priorities", search_request.priority))
         
         # Category filter
         if search_request.category_ids:
             query = query.filter(Task.category_id.in_(search_request.category_ids))
         
-        # Tags filter
+        # Tags filter: a single JSONB containment (tags @> [...]) served by the GIN index
         if search_request.tags:
-            for tag in search_request.tags:
-                query = query.filter(Task.tags.contains([tag]))
+            query = query.filter(Task.tags.contains(search_request.tags))
         
         # Date filters
         if search_request.due_date_from:
@@ -519,10 +534,10 @@ async def search_tasks(
         tasks = query.offset(offset).limit(search_request.size).all()
         
         return TaskListResponse(
-            tasks=tasks,
+            tasks=TASK_RESPONSE_LIST_ADAPTER.validate_python(tasks, from_attributes=True),
             total=total,
             page=search_request.page,
-            size=search_request.size
+            per_page=search_request.size
         )
         
     except Exception as e:
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
+from sqlalchemy import func, and_, or_, cast, Integer
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
 from core.database import get_db
@@ -13,10 +14,32 @@ from schemas.analytics import (
     ProductivityMetrics, TimeAnalytics, ExportData
 )
 import logging
+import numpy as np
+import orjson
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
+
+class AnalyticsResponse(ORJSONResponse):
+    """ORJSONResponse that also accepts NumPy arrays and naive datetimes in histogram payloads"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC
+        )
+
+
+router = APIRouter(default_response_class=AnalyticsResponse)
+
+
+def _histogram(rows, size: int) -> List[int]:
+    """Expand grouped (bucket, count) rows into a fixed-size list of counts"""
+    counts = np.zeros(size, dtype=np.int64)
+    if rows:
+        buckets, values = zip(*rows)
+        counts[np.asarray(buckets, dtype=np.intp)] = values
+    return counts.tolist()
 
 
 @router.get("/overview", response_model=AnalyticsOverview)
@@ -257,7 +280,7 @@ async def get_productivity_metrics(
         
         # Most productive hours (based on task creation)
         hourly_stats = db.query(
-            func.extract('hour', Task.created_at).label('hour'),
+            cast(func.extract('hour', Task.created_at), Integer).label('hour'),
             func.count(Task.id).label('count')
         ).filter(
             and_(
@@ -266,11 +289,11 @@ async def get_productivity_metrics(
             )
         ).group_by(func.extract('hour', Task.created_at)).all()
         
-        hourly_productivity = {int(stat.hour): stat.count for stat in hourly_stats}
+        hourly_productivity = _histogram(hourly_stats, 24)
         
         # Most productive days (based on task completion)
         daily_stats = db.query(
-            func.extract('dow', Task.updated_at).label('day_of_week'),
+            cast(func.extract('dow', Task.updated_at), Integer).label('day_of_week'),
             func.count(Task.id).label('count')
         ).filter(
             and_(
@@ -280,7 +303,7 @@ async def get_productivity_metrics(
             )
         ).group_by(func.extract('dow', Task.updated_at)).all()
         
-        daily_productivity = {int(stat.day_of_week): stat.count for stat in daily_stats}
+        daily_productivity = _histogram(daily_stats, 7)
         
         # Streak calculation (consecutive days with task completion)
         completed_dates = db.query(
@@ -334,7 +357,7 @@ async def get_time_analytics(
         
         # Tasks by time of day
         time_stats = db.query(
-            func.extract('hour', Task.created_at).label('hour'),
+            cast(func.extract('hour', Task.created_at), Integer).label('hour'),
             func.count(Task.id).label('count')
         ).filter(
             and_(
@@ -343,11 +366,11 @@ async def get_time_analytics(
             )
         ).group_by(func.extract('hour', Task.created_at)).all()
         
-        tasks_by_hour = {int(stat.hour): stat.count for stat in time_stats}
+        tasks_by_hour = _histogram(time_stats, 24)
         
         # Tasks by day of week
         dow_stats = db.query(
-            func.extract('dow', Task.created_at).label('day_of_week'),
+            cast(func.extract('dow', Task.created_at), Integer).label('day_of_week'),
             func.count(Task.id).label('count')
         ).filter(
             and_(
@@ -356,7 +379,7 @@ async def get_time_analytics(
             )
         ).group_by(func.extract('dow', Task.created_at)).all()
         
-        tasks_by_day = {int(stat.day_of_week): stat.count for stat in dow_stats}
+        tasks_by_day = _histogram(dow_stats, 7)
         
         # Overdue trends
         overdue_trends = db.query(
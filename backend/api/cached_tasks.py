@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
 from core.database import get_db
 from core.cache import get_cache, CacheService
+from core.query_optimizer import QueryOptimizer
 from models.task import Task, Category
 from models.user import User
-from schemas.task import TaskResponse, TaskCreate, TaskUpdate, TaskListResponse, CategoryResponse, CategoryCreate, CategoryUpdate
+from schemas.task import TaskResponse, TaskCreate, TaskUpdate, TaskListResponse, TASK_RESPONSE_LIST_ADAPTER, CategoryResponse, CATEGORY_RESPONSE_LIST_ADAPTER, CategoryCreate, CategoryUpdate
 from api.auth import get_current_user
 import logging
 
@@ -37,7 +38,7 @@ async def get_tasks_cached(
     
     # If not in cache, query database
     logger.info(f"Cache miss for tasks: {cache_key}")
-    query = db.query(Task).filter(Task.user_id == current_user.id)
+    query = db.query(Task).options(joinedload(Task.category)).filter(Task.user_id == current_user.id)
     
     # Apply filters
     if status:
@@ -56,7 +57,7 @@ async def get_tasks_cached(
     
     # Convert to response format
     result = TaskListResponse(
-        tasks=[TaskResponse.from_orm(task) for task in tasks],
+        tasks=TASK_RESPONSE_LIST_ADAPTER.validate_python(tasks, from_attributes=True),
         total=total,
         page=page,
         per_page=per_page
@@ -86,15 +87,12 @@ async def get_task_cached(
     
     # Query database
     logger.info(f"Cache miss for task: {cache_key}")
-    task = db.query(Task).filter(
-        Task.id == task_id,
-        Task.user_id == current_user.id
-    ).first()
+    task = QueryOptimizer.get_task_with_relations(db, task_id, current_user.id)
     
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    result = TaskResponse.from_orm(task)
+    result = TaskResponse.model_validate(task)
     
     # Cache for 5 minutes
     cache.set(cache_key, result.dict(), ttl=300)
@@ -121,10 +119,10 @@ async def get_categories_cached(
     logger.info(f"Cache miss for categories: {cache_key}")
     categories = db.query(Category).filter(Category.user_id == current_user.id).all()
     
-    result = [CategoryResponse.from_orm(category) for category in categories]
+    result = CATEGORY_RESPONSE_LIST_ADAPTER.validate_python(categories, from_attributes=True)
     
     # Cache for 10 minutes (categories change less frequently)
-    cache.set(cache_key, [cat.dict() for cat in result], ttl=600)
+    cache.set(cache_key, CATEGORY_RESPONSE_LIST_ADAPTER.dump_python(result), ttl=600)
     
     return result
 
@@ -145,14 +143,14 @@ async def create_task_cached(
     
     db.add(task)
     db.commit()
-    db.refresh(task)
+    task = QueryOptimizer.get_task_with_relations(db, task.id, current_user.id)
     
     # Invalidate task list cache for this user
     cache.delete_pattern(f"tasks:user:{current_user.id}:*")
     
     logger.info(f"Created task {task.id} and invalidated task list cache")
     
-    return TaskResponse.from_orm(task)
+    return TaskResponse.model_validate(task)
 
 @router.put("/tasks/{task_id}", response_model=TaskResponse)
 async def update_task_cached(
@@ -164,10 +162,7 @@ async def update_task_cached(
 ):
     """Update task and invalidate related cache"""
     
-    task = db.query(Task).filter(
-        Task.id == task_id,
-        Task.user_id == current_user.id
-    ).first()
+    task = QueryOptimizer.get_task_with_relations(db, task_id, current_user.id)
     
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
@@ -177,7 +172,7 @@ async def update_task_cached(
         setattr(task, field, value)
     
     db.commit()
-    db.refresh(task)
+    task = QueryOptimizer.get_task_with_relations(db, task_id, current_user.id)
     
     # Invalidate caches
     cache.delete_pattern(f"tasks:user:{current_user.id}:*")
@@ -185,7 +180,7 @@ async def update_task_cached(
     
     logger.info(f"Updated task {task_id} and invalidated related caches")
     
-    return TaskResponse.from_orm(task)
+    return TaskResponse.model_validate(task)
 
 @router.delete("/tasks/{task_id}")
 async def delete_task_cached(
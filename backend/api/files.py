@@ -2,12 +2,13 @@ from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
 from sqlalchemy.orm import Session
 from typing import List
 import os
+import uuid
 
 from core.database import get_db
 from models.user import User
 from models.task import Task
-from models.file import TaskFile
-from schemas.file import TaskFileResponse, TaskFileListResponse, FileUploadResponse
+from models.file import TaskFile, DEFAULT_S3_BUCKET_ID
+from schemas.file import TaskFileResponse, TaskFileListResponse, TASK_FILE_RESPONSE_LIST_ADAPTER, FileUploadResponse
 from api.auth import get_current_user
 from core.s3_service import s3_service
 
@@ -94,24 +95,21 @@ async def upload_file_to_task(
     # Read file content
     file_content = await file.read()
     
-    # Generate S3 key
-    s3_key = s3_service.generate_file_key(current_user.id, task_id, file.filename)
-    
-    # Upload to S3
-    s3_service.upload_file(file_content, s3_key, file.content_type)
-    
-    # Save file record to database
+    # The S3 key is derived from the task id and a random object uuid
     db_file = TaskFile(
         filename=file.filename,
         original_filename=file.filename,
         file_size=len(file_content),
         content_type=file.content_type,
-        s3_key=s3_key,
-        s3_bucket=s3_service.bucket_name,
+        s3_bucket_id=DEFAULT_S3_BUCKET_ID,
+        s3_object_uuid=uuid.uuid4(),
         task_id=task_id,
         user_id=current_user.id
     )
     
+    # Upload to S3
+    s3_service.upload_file(file_content, db_file.s3_key, file.content_type)
+    
     db.add(db_file)
     db.commit()
     db.refresh(db_file)
@@ -148,7 +146,7 @@ async def get_task_files(
     ).all()
     
     return TaskFileListResponse(
-        files=files,
+        files=TASK_FILE_RESPONSE_LIST_ADAPTER.validate_python(files, from_attributes=True),
         total=len(files)
     )
 
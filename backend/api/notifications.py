@@ -6,7 +6,7 @@ from api.auth import get_current_user
 from models.user import User
 from models.notification import Notification, NotificationPreference, EmailTemplate, NotificationType, NotificationStatus
 from schemas.notification import (
-    NotificationResponse, NotificationCreate, NotificationUpdate,
+    NotificationResponse, NOTIFICATION_RESPONSE_LIST_ADAPTER, NotificationCreate, NotificationUpdate,
     NotificationPreferenceResponse, NotificationPreferenceCreate, NotificationPreferenceUpdate,
     EmailTemplateResponse, EmailTemplateCreate, EmailTemplateUpdate,
     SendNotificationRequest, UnsubscribeRequest
@@ -43,7 +43,7 @@ async def send_notification(
             type=request.type,
             title=request.title,
             message=request.message,
-            metadata=request.metadata
+            extra_data=request.metadata
         )
         db.add(notification)
         db.commit()
@@ -144,7 +144,7 @@ async def get_notifications(
         query = query.filter(Notification.status == status_filter)
 
     notifications = query.offset(skip).limit(limit).all()
-    return notifications
+    return NOTIFICATION_RESPONSE_LIST_ADAPTER.validate_python(notifications, from_attributes=True)
 
 
 @router.get("/{notification_id}", response_model=NotificationResponse)
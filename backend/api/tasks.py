@@ -1,13 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
 from datetime import datetime
 
 from core.database import get_db
+from core.query_optimizer import QueryOptimizer
 from models.user import User
 from models.task import Task, Category, TaskStatus, TaskPriority
 from schemas.task import (
-    TaskCreate, TaskUpdate, TaskResponse, TaskListResponse,
+    TaskCreate, TaskUpdate, TaskResponse, TaskListResponse, TASK_RESPONSE_LIST_ADAPTER,
     TaskStatusUpdate, TaskPriorityUpdate,
     CategoryCreate, CategoryUpdate, CategoryResponse
 )
@@ -28,7 +29,8 @@ async def get_tasks(
     current_user: User = Depends(get_current_user)
 ):
     """Get user's tasks with filtering and pagination"""
-    query = db.query(Task).filter(Task.user_id == current_user.id)
+    # Relationships are lazy="raise_on_sql"; TaskResponse serializes category
+    query = db.query(Task).options(joinedload(Task.category)).filter(Task.user_id == current_user.id)
     
     # Apply filters
     if status:
@@ -45,7 +47,7 @@ async def get_tasks(
     tasks = query.offset((page - 1) * size).limit(size).all()
     
     return TaskListResponse(
-        tasks=tasks,
+        tasks=TASK_RESPONSE_LIST_ADAPTER.validate_python(tasks, from_attributes=True),
         total=total,
         page=page,
         per_page=size
@@ -74,8 +76,7 @@ async def create_task(
     )
     db.add(db_task)
     db.commit()
-    db.refresh(db_task)
-    return db_task
+    return QueryOptimizer.get_task_with_relations(db, db_task.id, current_user.id)
 
 
 @router.get("/tasks/{task_id}", response_model=TaskResponse)
@@ -85,10 +86,7 @@ async def get_task(
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific task"""
-    task = db.query(Task).filter(
-        Task.id == task_id,
-        Task.user_id == current_user.id
-    ).first()
+    task = QueryOptimizer.get_task_with_relations(db, task_id, current_user.id)
     
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
@@ -104,10 +102,7 @@ async def update_task(
     current_user: User = Depends(get_current_user)
 ):
     """Update a task"""
-    task = db.query(Task).filter(
-        Task.id == task_id,
-        Task.user_id == current_user.id
-    ).first()
+    task = QueryOptimizer.get_task_with_relations(db, task_id, current_user.id)
     
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
@@ -128,7 +123,7 @@ async def update_task(
     
     task.updated_at = datetime.utcnow()
     db.commit()
-    db.refresh(task)
+    task = QueryOptimizer.get_task_with_relations(db, task_id, current_user.id)
     return task
 
 
@@ -160,10 +155,7 @@ async def update_task_status(
     current_user: User = Depends(get_current_user)
 ):
     """Update task status"""
-    task = db.query(Task).filter(
-        Task.id == task_id,
-        Task.user_id == current_user.id
-    ).first()
+    task = QueryOptimizer.get_task_with_relations(db, task_id, current_user.id)
     
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
@@ -175,7 +167,7 @@ async def update_task_status(
     task.status = status_update.status
     task.updated_at = datetime.utcnow()
     db.commit()
-    db.refresh(task)
+    task = QueryOptimizer.get_task_with_relations(db, task_id, current_user.id)
     
     # Send completion notification if task was just completed
     if not was_completed and is_being_completed:
@@ -199,10 +191,7 @@ async def update_task_priority(
     current_user: User = Depends(get_current_user)
 ):
     """Update task priority"""
-    task = db.query(Task).filter(
-        Task.id == task_id,
-        Task.user_id == current_user.id
-    ).first()
+    task = QueryOptimizer.get_task_with_relations(db, task_id, current_user.id)
     
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
@@ -210,7 +199,7 @@ async def update_task_priority(
     task.priority = priority_update.priority
     task.updated_at = datetime.utcnow()
     db.commit()
-    db.refresh(task)
+    task = QueryOptimizer.get_task_with_relations(db, task_id, current_user.id)
     return task
 
 
@@ -22,6 +22,11 @@ async def websocket_tasks_endpoint(
 ):
     """
     WebSocket endpoint for real-time task updates
+
+    "task_update" messages are batched: each frame is a JSON array of one or more
+    {"type", "data", "timestamp"} objects sent within a few milliseconds of each
+    other. Every other server message (connection_established, ping,
+    subscription confirmations) is a single JSON object frame.
     """
     try:
         # In a real implementation, you'd validate the token here
@@ -44,6 +49,11 @@ async def websocket_notifications_endpoint(
 ):
     """
     WebSocket endpoint for real-time notifications
+
+    "notification" messages are batched: each frame is a JSON array of one or more
+    {"type", "data", "timestamp"} objects sent within a few milliseconds of each
+    other. Every other server message (connection_established, ping,
+    subscription confirmations) is a single JSON object frame.
     """
     try:
         await websocket_service.handle_websocket(
@@ -63,6 +73,11 @@ async def websocket_analytics_endpoint(
 ):
     """
     WebSocket endpoint for real-time analytics updates
+
+    "analytics_update" messages are batched: each frame is a JSON array of one or more
+    {"type", "data", "timestamp"} objects sent within a few milliseconds of each
+    other. Every other server message (connection_established, ping,
+    subscription confirmations) is a single JSON object frame.
     """
     try:
         await websocket_service.handle_websocket(
@@ -1,3 +1,4 @@
+from pydantic import field_validator
 from pydantic_settings import BaseSettings
 from typing import List
 import os
@@ -11,7 +12,19 @@ class Settings(BaseSettings):
     TESTING: bool = False
     
     # Database settings
-    DATABASE_URL: str = "postgresql://user:pass@db:5432/mydb"
+    DATABASE_URL: str = "postgresql+psycopg://user:pass@db:5432/mydb"
+    # psycopg 3 server-side prepares a query after it has run this many times;
+    # needs PgBouncer >= 1.22 (max_prepared_statements) when pooling in transaction mode
+    DB_PREPARE_THRESHOLD: int = 5
+    
+    @field_validator("DATABASE_URL")
+    @classmethod
+    def use_psycopg_driver(cls, value: str) -> str:
+        """Plain postgres:// and postgresql:// URLs would load psycopg2, which is not installed"""
+        for scheme in ("postgresql://", "postgres://"):
+            if value.startswith(scheme):
+                return "postgresql+psycopg://" + value[len(scheme):]
+        return value
     
     # JWT settings
     JWT_SECRET: str = "your-secret-key"
@@ -1,14 +1,27 @@
-from sqlalchemy import create_engine
+import orjson
+from sqlalchemy import create_engine, JSON, String, BigInteger, Integer
+from sqlalchemy.types import TypeDecorator
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import sessionmaker
 from core.config import settings
 
+# Protocol-level prepared statements for repeated queries (psycopg 3 only)
+connect_args = {}
+if settings.DATABASE_URL.startswith("postgresql+psycopg://"):
+    connect_args["prepare_threshold"] = settings.DB_PREPARE_THRESHOLD
+
 # Create database engine
 engine = create_engine(
     settings.DATABASE_URL,
     echo=settings.DEBUG,
     pool_pre_ping=True,
-    pool_recycle=300
+    pool_recycle=300,
+    insertmanyvalues_page_size=1000,
+    connect_args=connect_args,
+    # JSON/JSONB columns are encoded and decoded with orjson; the driver expects str
+    json_serializer=lambda value: orjson.dumps(value).decode(),
+    json_deserializer=orjson.loads
 )
 
 # Create session factory
@@ -17,6 +30,32 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Create base class for models
 Base = declarative_base()
 
+# JSONB on PostgreSQL (GIN-indexable, containment via @>); plain JSON on SQLite for tests
+JSONBType = JSONB().with_variant(JSON(), "sqlite")
+
+# BIGINT keys on PostgreSQL; SQLite only autoincrements an INTEGER PRIMARY KEY
+BigIntegerType = BigInteger().with_variant(Integer(), "sqlite")
+
+
+class EnumAsString(TypeDecorator):
+    """Store a Python enum as its plain string value instead of a native DB enum type"""
+    impl = String
+    cache_ok = True
+
+    def __init__(self, enum_class, length=20):
+        super().__init__(length)
+        self.enum_class = enum_class
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return self.enum_class(value).value
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return self.enum_class(value)
+
 
 def get_db():
     """Dependency to get database session"""
@@ -59,6 +59,15 @@ class DynamoDBService:
                 
                 # Wait for table to be created
                 table.wait_until_exists()
+                
+                # Let DynamoDB expire items through their ttl attribute
+                self.dynamodb.meta.client.update_time_to_live(
+                    TableName=self.table_name,
+                    TimeToLiveSpecification={
+                        'Enabled': True,
+                        'AttributeName': 'ttl'
+                    }
+                )
                 logger.info(f"Table {self.table_name} created successfully")
             else:
                 logger.error(f"Error checking table existence: {e}")
@@ -1,9 +1,9 @@
 import boto3
-import uuid
 import os
 from typing import Optional
 from fastapi import HTTPException
 from core.config import settings
+from models.file import S3_BUCKETS, DEFAULT_S3_BUCKET_ID
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,7 +12,7 @@ logger = logging.getLogger(__name__)
 class S3Service:
     def __init__(self):
         self.s3_client = None
-        self.bucket_name = "taskflow-files"
+        self.bucket_name = S3_BUCKETS[DEFAULT_S3_BUCKET_ID]
         self._initialized = False
         
     def _initialize(self):
@@ -55,12 +55,6 @@ class S3Service:
             if not (settings.TESTING or os.getenv("TESTING") == "true"):
                 raise HTTPException(status_code=500, detail="Failed to access file storage")
 
-    def generate_file_key(self, user_id: int, task_id: int, filename: str) -> str:
-        """Generate a unique S3 key for the file"""
-        file_extension = filename.split('.')[-1] if '.' in filename else ''
-        unique_filename = f"{uuid.uuid4()}.{file_extension}" if file_extension else str(uuid.uuid4())
-        return f"users/{user_id}/tasks/{task_id}/{unique_filename}"
-
     def upload_file(self, file_content: bytes, s3_key: str, content_type: str) -> bool:
         """Upload file to S3"""
         self._initialize()
@@ -1,13 +1,18 @@
 from celery import current_task
 import os
+import orjson
+from sqlalchemy import select, delete, text
 from sqlalchemy.orm import Session
 from core.database import get_db
-from models.notification import Notification, NotificationStatus
+from models.notification import (
+    Notification, NotificationStatus,
+    create_notification_partition, month_start, notification_partition_name,
+)
 from models.task import Task
 from models.user import User
 from typing import List, Dict, Any
 import logging
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
@@ -15,27 +20,52 @@ logger = logging.getLogger(__name__)
 def cleanup_old_notifications_task():
     """
     Clean up old notifications (older than 30 days)
+
+    On PostgreSQL notifications are partitioned by month: this creates the
+    upcoming partitions and drops whole months past the cutoff instead of
+    deleting rows.
     """
     db = next(get_db())
     try:
         cutoff_date = datetime.now() - timedelta(days=30)
-        
-        # Delete old notifications
-        old_notifications = db.query(Notification).filter(
-            Notification.created_at < cutoff_date
-        ).all()
-        
-        deleted_count = len(old_notifications)
-        for notification in old_notifications:
-            db.delete(notification)
-        
+
+        if db.get_bind().dialect.name != "postgresql":
+            deleted_count = db.execute(
+                delete(Notification).where(Notification.created_at < cutoff_date)
+            ).rowcount
+            db.commit()
+
+            logger.info(f"Cleaned up {deleted_count} old notifications")
+            return {
+                'success': True,
+                'message': f'Cleaned up {deleted_count} old notifications',
+                'deleted_count': deleted_count
+            }
+
+        today = date.today()
+        for months in (0, 1):
+            create_notification_partition(db.connection(), month_start(today, months))
+
+        # Only months that end before the cutoff are dropped
+        oldest_kept = notification_partition_name(month_start(cutoff_date.date()))
+        partitions = db.execute(text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = 'notifications'::regclass"
+        )).scalars().all()
+        expired = sorted(name for name in partitions if name < oldest_kept)
+
+        for name in expired:
+            db.execute(text(f"ALTER TABLE notifications DETACH PARTITION {name}"))
+            db.execute(text(f"DROP TABLE {name}"))
+
         db.commit()
-        
-        logger.info(f"Cleaned up {deleted_count} old notifications")
+
+        logger.info(f"Dropped {len(expired)} old notification partitions")
         return {
-            'success': True, 
-            'message': f'Cleaned up {deleted_count} old notifications',
-            'deleted_count': deleted_count
+            'success': True,
+            'message': f'Dropped {len(expired)} old notification partitions',
+            'dropped_partitions': expired
         }
 
     except Exception as e:
@@ -179,7 +209,7 @@ def send_task_completion_notification_task(task_id: int):
             type='task_completed',
             title=f"Task Completed: {task.title}",
             message=f"Congratulations! You have completed the task: {task.title}",
-            metadata={'task_id': task_id}
+            extra_data={'task_id': task_id}
         )
         db.add(notification)
         db.commit()
@@ -210,62 +240,43 @@ def backup_user_data_task(user_id: int):
             logger.error(f"User {user_id} not found")
             return {'success': False, 'error': 'User not found'}
 
-        # Get all user data
+        # Select plain columns through Core so rows come back as mappings
+        # without hydrating ORM instances; orjson serializes datetimes/enums.
+        from models.task import Category
+        tasks = db.execute(
+            select(
+                Task.id, Task.title, Task.description, Task.status, Task.priority,
+                Task.due_date, Task.category_id, Task.created_at, Task.updated_at
+            ).where(Task.user_id == user_id).execution_options(stream_results=True)
+        ).mappings()
+        categories = db.execute(
+            select(
+                Category.id, Category.name, Category.color, Category.created_at
+            ).where(Category.user_id == user_id).execution_options(stream_results=True)
+        ).mappings()
+        notifications = db.execute(
+            select(
+                Notification.id, Notification.type, Notification.title, Notification.message,
+                Notification.status, Notification.email_sent, Notification.email_sent_at,
+                Notification.extra_data.label('metadata'),
+                Notification.created_at, Notification.updated_at
+            ).where(Notification.user_id == user_id).execution_options(stream_results=True)
+        ).mappings()
+
         user_data = {
             'user': {
                 'id': user.id,
                 'email': user.email,
                 'full_name': user.full_name,
                 'is_active': user.is_active,
-                'created_at': user.created_at.isoformat() if user.created_at else None,
-                'updated_at': user.updated_at.isoformat() if user.updated_at else None
+                'created_at': user.created_at,
+                'updated_at': user.updated_at
             },
-            'tasks': [],
-            'categories': [],
-            'notifications': []
+            'tasks': list(map(dict, tasks)),
+            'categories': list(map(dict, categories)),
+            'notifications': list(map(dict, notifications))
         }
-
-        # Get tasks
-        tasks = db.query(Task).filter(Task.user_id == user_id).all()
-        for task in tasks:
-            user_data['tasks'].append({
-                'id': task.id,
-                'title': task.title,
-                'description': task.description,
-                'status': task.status.value,
-                'priority': task.priority.value,
-                'due_date': task.due_date.isoformat() if task.due_date else None,
-                'category_id': task.category_id,
-                'created_at': task.created_at.isoformat() if task.created_at else None,
-                'updated_at': task.updated_at.isoformat() if task.updated_at else None
-            })
-
-        # Get categories
-        from models.task import Category
-        categories = db.query(Category).filter(Category.user_id == user_id).all()
-        for category in categories:
-            user_data['categories'].append({
-                'id': category.id,
-                'name': category.name,
-                'color': category.color,
-                'created_at': category.created_at.isoformat() if category.created_at else None
-            })
-
-        # Get notifications
-        notifications = db.query(Notification).filter(Notification.user_id == user_id).all()
-        for notification in notifications:
-            user_data['notifications'].append({
-                'id': notification.id,
-                'type': notification.type.value,
-                'title': notification.title,
-                'message': notification.message,
-                'status': notification.status.value,
-                'email_sent': notification.email_sent,
-                'email_sent_at': notification.email_sent_at.isoformat() if notification.email_sent_at else None,
-                'metadata': notification.metadata,
-                'created_at': notification.created_at.isoformat() if notification.created_at else None,
-                'updated_at': notification.updated_at.isoformat() if notification.updated_at else None
-            })
+        backup = orjson.dumps(user_data, option=orjson.OPT_NAIVE_UTC)
 
         # Here you would typically save this data to S3 or another storage service
         # For now, we'll just log the backup
@@ -275,7 +286,7 @@ def backup_user_data_task(user_id: int):
             'success': True,
             'message': 'User data backup created',
             'user_id': user_id,
-            'backup_size': len(str(user_data))
+            'backup_size': len(backup)
         }
 
     except Exception as e:
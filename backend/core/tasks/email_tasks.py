@@ -1,5 +1,6 @@
 from celery import current_task
 import os
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from core.database import get_db
 from core.ses_service import ses_service
@@ -192,8 +193,8 @@ def send_notification_email_task(notification_id: int):
         }
 
         # Add task-specific data if available
-        if notification.metadata and 'task_id' in notification.metadata:
-            task = db.query(Task).filter(Task.id == notification.metadata['task_id']).first()
+        if notification.extra_data and 'task_id' in notification.extra_data:
+            task = db.query(Task).filter(Task.id == notification.extra_data['task_id']).first()
             if task:
                 template_context.update({
                     'task_title': task.title,
@@ -240,6 +241,22 @@ def send_notification_email_task(notification_id: int):
         db.close()
 
 
+def create_notifications(db: Session, rows: List[Dict[str, Any]]) -> List[int]:
+    """
+    Insert a batch of notifications in one multi-row INSERT ... RETURNING and commit
+    """
+    if not rows:
+        return []
+    notification_ids = db.scalars(
+        insert(Notification)
+        .returning(Notification.id)
+        .execution_options(insertmanyvalues_page_size=500),
+        rows
+    ).all()
+    db.commit()
+    return notification_ids
+
+
 def send_task_reminders_task():
     """
     Send reminders for tasks that need attention
@@ -259,29 +276,28 @@ def send_task_reminders_task():
                 Task.created_at < datetime.now() - timedelta(hours=24)
             ).all()
 
+            new_notifications = []
             for task in reminder_tasks:
                 # Check if we already sent a reminder recently
                 recent_reminder = db.query(Notification).filter(
                     Notification.user_id == user.id,
                     Notification.type == NotificationType.TASK_REMINDER,
-                    Notification.metadata.contains({'task_id': task.id}),
+                    Notification.extra_data.contains({'task_id': task.id}),
                     Notification.created_at > datetime.now() - timedelta(hours=24)
                 ).first()
 
                 if not recent_reminder:
-                    # Create notification
-                    notification = Notification(
-                        user_id=user.id,
-                        type=NotificationType.TASK_REMINDER,
-                        title=f"Task Reminder: {task.title}",
-                        message=f"This is a reminder about your task: {task.title}",
-                        metadata={'task_id': task.id}
-                    )
-                    db.add(notification)
-                    db.commit()
-
-                    # Send email
-                    send_notification_email.delay(notification.id)
+                    new_notifications.append({
+                        'user_id': user.id,
+                        'type': NotificationType.TASK_REMINDER,
+                        'title': f"Task Reminder: {task.title}",
+                        'message': f"This is a reminder about your task: {task.title}",
+                        'extra_data': {'task_id': task.id}
+                    })
+
+            # Send emails
+            for notification_id in create_notifications(db, new_notifications):
+                send_notification_email.delay(notification_id)
 
         logger.info("Task reminders processed successfully")
         return {'success': True, 'message': 'Task reminders processed'}
@@ -315,29 +331,28 @@ def send_due_date_alerts_task():
                 Task.due_date > datetime.now()
             ).all()
 
+            new_notifications = []
             for task in due_soon_tasks:
                 # Check if we already sent an alert recently
                 recent_alert = db.query(Notification).filter(
                     Notification.user_id == user.id,
                     Notification.type == NotificationType.DUE_DATE_ALERT,
-                    Notification.metadata.contains({'task_id': task.id}),
+                    Notification.extra_data.contains({'task_id': task.id}),
                     Notification.created_at > datetime.now() - timedelta(hours=1)
                 ).first()
 
                 if not recent_alert:
-                    # Create notification
-                    notification = Notification(
-                        user_id=user.id,
-                        type=NotificationType.DUE_DATE_ALERT,
-                        title=f"URGENT: Task Due Soon - {task.title}",
-                        message=f"Your task '{task.title}' is due soon!",
-                        metadata={'task_id': task.id}
-                    )
-                    db.add(notification)
-                    db.commit()
-
-                    # Send email
-                    send_notification_email.delay(notification.id)
+                    new_notifications.append({
+                        'user_id': user.id,
+                        'type': NotificationType.DUE_DATE_ALERT,
+                        'title': f"URGENT: Task Due Soon - {task.title}",
+                        'message': f"Your task '{task.title}' is due soon!",
+                        'extra_data': {'task_id': task.id}
+                    })
+
+            # Send emails
+            for notification_id in create_notifications(db, new_notifications):
+                send_notification_email.delay(notification_id)
 
         logger.info("Due date alerts processed successfully")
         return {'success': True, 'message': 'Due date alerts processed'}
@@ -372,7 +387,7 @@ def send_welcome_email_task(user_id: int):
             type=NotificationType.WELCOME,
             title="Welcome to TaskFlow!",
             message="Welcome to TaskFlow! We're excited to help you stay organized and productive.",
-            metadata={'user_id': user_id}
+            extra_data={'user_id': user_id}
         )
         db.add(notification)
         db.commit()
@@ -1,34 +1,123 @@
 from fastapi import WebSocket, WebSocketDisconnect
-from typing import Dict, List, Set
-import json
+from typing import Any, Dict, List, Optional, Set, Tuple
+from collections import defaultdict
+import orjson
 import logging
 from datetime import datetime
 import asyncio
+import time
+from dataclasses import dataclass, field
 
 logger = logging.getLogger(__name__)
 
+# Naive datetimes are treated as UTC and emitted with a "Z" suffix
+ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z
+
+# Upper bound for a single socket send so one slow peer cannot stall a fan-out
+SEND_TIMEOUT_SECONDS = 5.0
+# Frames buffered per socket before the client is treated as too slow
+OUTBOUND_QUEUE_SIZE = 1000
+# Frames the writer drains per wake-up
+WRITER_BATCH_SIZE = 32
+# Window in which queued updates for a socket are coalesced into one JSON array frame
+COALESCE_WINDOW_SECONDS = 0.005
+# Keep-alive ping cadence
+PING_INTERVAL_SECONDS = 30
+# Sockets written to within this window skip the ping; kept shorter than the cadence, since the
+# writer stamps the previous ping's send after that pass ran
+PING_IDLE_WINDOW_SECONDS = PING_INTERVAL_SECONDS / 2
+
+
+# Subscription confirmations are rendered from byte templates; only known
+# subscription types take this path so the value never needs JSON escaping
+SUBSCRIPTION_TYPES = frozenset({"tasks", "notifications", "analytics", "collaboration"})
+SUBSCRIPTION_CONFIRMED_TEMPLATE = b'{"type":"subscription_confirmed","subscription_type":"%b","timestamp":%b}'
+UNSUBSCRIPTION_CONFIRMED_TEMPLATE = b'{"type":"unsubscription_confirmed","subscription_type":"%b","timestamp":%b}'
+
+
+_timestamp_cache: Tuple[int, datetime] = (-1, datetime.min)
+
+
+def message_timestamp() -> datetime:
+    """Return the current time, shared by all messages built within the same ~1ms tick"""
+    global _timestamp_cache
+    tick = time.monotonic_ns() >> 20
+    if _timestamp_cache[0] != tick:
+        _timestamp_cache = (tick, datetime.now())
+    return _timestamp_cache[1]
+
+
+@dataclass(slots=True)
+class Envelope:
+    """Outbound update message; orjson serializes slotted dataclasses without building a dict"""
+    type: str
+    data: Any
+    timestamp: datetime
+
+
+@dataclass(slots=True)
+class CollaborationEnvelope(Envelope):
+    task_id: int
+
+
+@dataclass(slots=True)
+class ConnectionState:
+    """Per-socket bookkeeping kept by ConnectionManager"""
+    user_id: int
+    connection_type: str
+    queue: asyncio.Queue
+    writer: asyncio.Task
+    connected_at: datetime
+    last_ping: datetime
+    last_send: float
+    subscriptions: Set[str] = field(default_factory=set)
+    pending: List[Any] = field(default_factory=list)
+    flush_handle: Optional[asyncio.TimerHandle] = None
+
+
+def encode_message(message: Any) -> bytes:
+    """Serialize a message to a WebSocket wire frame"""
+    return orjson.dumps(message, option=ORJSON_OPTIONS)
+
+
+def encode_subscription_message(message_type: str, template: bytes, subscription_type: str) -> bytes:
+    """Render a (un)subscription confirmation frame"""
+    if subscription_type in SUBSCRIPTION_TYPES:
+        return template % (subscription_type.encode(), encode_message(message_timestamp()))
+    
+    return encode_message({
+        "type": message_type,
+        "subscription_type": subscription_type,
+        "timestamp": message_timestamp()
+    })
+
 
 class ConnectionManager:
     def __init__(self):
         # Store active connections by user_id
-        self.active_connections: Dict[int, List[WebSocket]] = {}
+        self.active_connections: Dict[int, Set[WebSocket]] = {}
         # Store connection metadata
-        self.connection_metadata: Dict[WebSocket, Dict] = {}
+        self.connection_metadata: Dict[WebSocket, ConnectionState] = {}
+        # Index connections by (user_id, connection_type) for typed sends
+        self.typed_connections: Dict[Tuple[int, str], Set[WebSocket]] = defaultdict(set)
 
     async def connect(self, websocket: WebSocket, user_id: int, connection_type: str = "general"):
         """Accept a new WebSocket connection"""
         await websocket.accept()
         
-        if user_id not in self.active_connections:
-            self.active_connections[user_id] = []
-        
-        self.active_connections[user_id].append(websocket)
-        self.connection_metadata[websocket] = {
-            'user_id': user_id,
-            'connection_type': connection_type,
-            'connected_at': datetime.now(),
-            'last_ping': datetime.now()
-        }
+        self.active_connections.setdefault(user_id, set()).add(websocket)
+        self.typed_connections[(user_id, connection_type)].add(websocket)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=OUTBOUND_QUEUE_SIZE)
+        now = datetime.now()
+        self.connection_metadata[websocket] = ConnectionState(
+            user_id=user_id,
+            connection_type=connection_type,
+            queue=queue,
+            writer=asyncio.create_task(self._writer_loop(websocket, queue)),
+            connected_at=now,
+            last_ping=now,
+            last_send=time.monotonic()
+        )
         
         logger.info(f"User {user_id} connected with {connection_type} connection")
         
@@ -36,111 +125,196 @@ class ConnectionManager:
         await self.send_personal_message({
             "type": "connection_established",
             "message": "Connected to TaskFlow real-time updates",
-            "timestamp": datetime.now().isoformat()
+            "timestamp": message_timestamp()
         }, websocket)
 
     def disconnect(self, websocket: WebSocket):
         """Remove a WebSocket connection"""
         if websocket in self.connection_metadata:
             metadata = self.connection_metadata[websocket]
-            user_id = metadata['user_id']
+            user_id = metadata.user_id
             
             if user_id in self.active_connections:
-                self.active_connections[user_id].remove(websocket)
+                self.active_connections[user_id].discard(websocket)
                 if not self.active_connections[user_id]:
                     del self.active_connections[user_id]
             
+            typed_key = (user_id, metadata.connection_type)
+            typed = self.typed_connections.get(typed_key)
+            if typed is not None:
+                typed.discard(websocket)
+                if not typed:
+                    del self.typed_connections[typed_key]
+            
+            if metadata.flush_handle is not None:
+                metadata.flush_handle.cancel()
+            
+            writer = metadata.writer
+            if writer is not asyncio.current_task():
+                writer.cancel()
+            
             del self.connection_metadata[websocket]
             logger.info(f"User {user_id} disconnected")
 
-    async def send_personal_message(self, message: dict, websocket: WebSocket):
-        """Send a message to a specific WebSocket connection"""
+    async def _safe_send(self, websocket: WebSocket, payload: bytes) -> Tuple[WebSocket, bool]:
+        """Send an already serialized frame, reporting failure instead of raising"""
         try:
-            await websocket.send_text(json.dumps(message))
+            await asyncio.wait_for(websocket.send_bytes(payload), timeout=SEND_TIMEOUT_SECONDS)
+            return websocket, True
         except Exception as e:
             logger.error(f"Error sending personal message: {e}")
+            return websocket, False
+
+    async def _writer_loop(self, websocket: WebSocket, queue: asyncio.Queue):
+        """Drain a connection's outbound queue, the only coroutine writing to the socket"""
+        while True:
+            frames = [await queue.get()]
+            while len(frames) < WRITER_BATCH_SIZE and not queue.empty():
+                frames.append(queue.get_nowait())
+            
+            for payload in frames:
+                _, ok = await self._safe_send(websocket, payload)
+                if not ok:
+                    self.disconnect(websocket)
+                    return
+            
+            # A successful write proves liveness, letting the next ping skip this socket
+            metadata = self.connection_metadata.get(websocket)
+            if metadata is not None:
+                metadata.last_send = time.monotonic()
+
+    def send_frame(self, websocket: WebSocket, payload: bytes) -> bool:
+        """Queue an already serialized frame for a socket; False if it is unknown or was dropped as too slow"""
+        metadata = self.connection_metadata.get(websocket)
+        if metadata is None:
+            return False
+        
+        try:
+            metadata.queue.put_nowait(payload)
+            return True
+        except asyncio.QueueFull:
+            logger.warning(f"Outbound queue full for user {metadata.user_id}, dropping slow client")
             self.disconnect(websocket)
+            return False
+
+    def _fan_out(self, websockets: List[WebSocket], payload: bytes) -> List[WebSocket]:
+        """Queue one frame for many sockets and return the ones that were dropped"""
+        return [ws for ws in websockets if not self.send_frame(ws, payload)]
+
+    def enqueue(self, websocket: WebSocket, message: Any):
+        """Buffer a message for a socket; buffered messages are sent together as one array frame"""
+        metadata = self.connection_metadata.get(websocket)
+        if metadata is None:
+            return
+        
+        metadata.pending.append(message)
+        if metadata.flush_handle is None:
+            metadata.flush_handle = asyncio.get_running_loop().call_later(
+                COALESCE_WINDOW_SECONDS, self._flush, websocket
+            )
+
+    def _flush(self, websocket: WebSocket):
+        """Send all buffered messages for a socket as a single JSON array frame"""
+        metadata = self.connection_metadata.get(websocket)
+        if metadata is None:
+            return
+        
+        metadata.flush_handle = None
+        pending = metadata.pending
+        if pending:
+            metadata.pending = []
+            self.send_frame(websocket, encode_message(pending))
+
+    def flush_now(self, websocket: WebSocket):
+        """Send buffered messages immediately instead of waiting for the coalescing window"""
+        metadata = self.connection_metadata.get(websocket)
+        if metadata is None:
+            return
+        
+        if metadata.flush_handle is not None:
+            metadata.flush_handle.cancel()
+        self._flush(websocket)
+
+    def _enqueue_to_user(self, message: Any, user_id: int, connection_type: str):
+        """Buffer a message for every connection of a user with the given type"""
+        for websocket in list(self.typed_connections.get((user_id, connection_type), ())):
+            self.enqueue(websocket, message)
+
+    async def send_personal_message(self, message: dict, websocket: WebSocket):
+        """Send a message to a specific WebSocket connection"""
+        self.send_frame(websocket, encode_message(message))
 
     async def send_to_user(self, message: dict, user_id: int, connection_type: str = None):
         """Send a message to all connections for a specific user"""
-        if user_id in self.active_connections:
-            connections_to_send = self.active_connections[user_id]
-            
-            if connection_type:
-                # Filter by connection type
-                connections_to_send = [
-                    ws for ws in connections_to_send
-                    if self.connection_metadata.get(ws, {}).get('connection_type') == connection_type
-                ]
-            
-            for websocket in connections_to_send:
-                await self.send_personal_message(message, websocket)
+        if connection_type:
+            connections_to_send = self.typed_connections.get((user_id, connection_type))
+        else:
+            connections_to_send = self.active_connections.get(user_id)
+        
+        if connections_to_send:
+            self._fan_out(list(connections_to_send), encode_message(message))
 
-    async def broadcast_to_all(self, message: dict, exclude_user: int = None):
+    async def broadcast_to_all(self, message: Any, exclude_user: int = None):
         """Broadcast a message to all connected users"""
-        for user_id, connections in self.active_connections.items():
-            if exclude_user and user_id == exclude_user:
-                continue
-            await self.send_to_user(message, user_id)
+        # Serialize once and reuse the same frame for every recipient
+        payload = encode_message(message)
+        recipients = [
+            websocket
+            for user_id, connections in self.active_connections.items()
+            if not (exclude_user and user_id == exclude_user)
+            for websocket in connections
+        ]
+        self._fan_out(recipients, payload)
 
     async def send_task_update(self, user_id: int, task_data: dict):
         """Send task update notification to user"""
-        message = {
-            "type": "task_update",
-            "data": task_data,
-            "timestamp": datetime.now().isoformat()
-        }
-        await self.send_to_user(message, user_id, "tasks")
+        message = Envelope(type="task_update", data=task_data, timestamp=message_timestamp())
+        self._enqueue_to_user(message, user_id, "tasks")
 
     async def send_notification(self, user_id: int, notification_data: dict):
         """Send notification to user"""
-        message = {
-            "type": "notification",
-            "data": notification_data,
-            "timestamp": datetime.now().isoformat()
-        }
-        await self.send_to_user(message, user_id, "notifications")
+        message = Envelope(type="notification", data=notification_data, timestamp=message_timestamp())
+        self._enqueue_to_user(message, user_id, "notifications")
 
     async def send_analytics_update(self, user_id: int, analytics_data: dict):
         """Send analytics update to user"""
-        message = {
-            "type": "analytics_update",
-            "data": analytics_data,
-            "timestamp": datetime.now().isoformat()
-        }
-        await self.send_to_user(message, user_id, "analytics")
+        message = Envelope(type="analytics_update", data=analytics_data, timestamp=message_timestamp())
+        self._enqueue_to_user(message, user_id, "analytics")
 
     async def send_collaboration_update(self, task_id: int, collaboration_data: dict):
         """Send collaboration update to all users working on a task"""
         # This would need to be implemented based on your collaboration logic
-        message = {
-            "type": "collaboration_update",
-            "task_id": task_id,
-            "data": collaboration_data,
-            "timestamp": datetime.now().isoformat()
-        }
+        message = CollaborationEnvelope(
+            type="collaboration_update",
+            data=collaboration_data,
+            timestamp=message_timestamp(),
+            task_id=task_id
+        )
         # For now, broadcast to all users - in production you'd filter by collaborators
         await self.broadcast_to_all(message)
 
     async def ping_connections(self):
         """Send ping to all connections to check if they're alive"""
+        # One timestamp for the whole pass: every connection is pinged at the same moment
+        now = datetime.now()
         ping_message = {
             "type": "ping",
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now
         }
         
-        dead_connections = []
+        ping_payload = encode_message(ping_message)
+        
+        # Only ping idle sockets; anything with queued or recent writes is already
+        # being exercised by its writer. The ping goes through the same queue, so the
+        # writer stays the socket's only sender and disconnects it if the send fails
+        idle_since = time.monotonic() - PING_IDLE_WINDOW_SECONDS
+        idle_connections = []
         for websocket, metadata in self.connection_metadata.items():
-            try:
-                await websocket.send_text(json.dumps(ping_message))
-                metadata['last_ping'] = datetime.now()
-            except Exception as e:
-                logger.warning(f"Connection ping failed: {e}")
-                dead_connections.append(websocket)
+            if metadata.queue.empty() and metadata.last_send < idle_since:
+                metadata.last_ping = now
+                idle_connections.append(websocket)
         
-        # Remove dead connections
-        for websocket in dead_connections:
-            self.disconnect(websocket)
+        self._fan_out(idle_connections, ping_payload)
 
     def get_connection_stats(self) -> dict:
         """Get statistics about active connections"""
@@ -149,7 +323,7 @@ class ConnectionManager:
         
         connection_types = {}
         for metadata in self.connection_metadata.values():
-            conn_type = metadata['connection_type']
+            conn_type = metadata.connection_type
             connection_types[conn_type] = connection_types.get(conn_type, 0) + 1
         
         return {
@@ -176,7 +350,7 @@ class WebSocketService:
             while True:
                 # Receive message from client
                 data = await websocket.receive_text()
-                message = json.loads(data)
+                message = orjson.loads(data)
                 
                 # Handle different message types
                 await self.handle_message(websocket, user_id, message)
@@ -194,7 +368,7 @@ class WebSocketService:
         if message_type == "pong":
             # Update last ping time
             if websocket in self.manager.connection_metadata:
-                self.manager.connection_metadata[websocket]['last_ping'] = datetime.now()
+                self.manager.connection_metadata[websocket].last_ping = datetime.now()
         
         elif message_type == "subscribe":
             # Subscribe to specific updates
@@ -226,37 +400,26 @@ class WebSocketService:
     async def subscribe_to_updates(self, websocket: WebSocket, user_id: int, subscription_type: str):
         """Subscribe to specific update types"""
         if websocket in self.manager.connection_metadata:
-            self.manager.connection_metadata[websocket]['subscriptions'] = \
-                self.manager.connection_metadata[websocket].get('subscriptions', set())
-            self.manager.connection_metadata[websocket]['subscriptions'].add(subscription_type)
+            self.manager.connection_metadata[websocket].subscriptions.add(subscription_type)
             
-            await self.send_personal_message({
-                "type": "subscription_confirmed",
-                "subscription_type": subscription_type,
-                "timestamp": datetime.now().isoformat()
-            }, websocket)
+            self.manager.send_frame(websocket, encode_subscription_message(
+                "subscription_confirmed", SUBSCRIPTION_CONFIRMED_TEMPLATE, subscription_type
+            ))
 
     async def unsubscribe_from_updates(self, websocket: WebSocket, user_id: int, subscription_type: str):
         """Unsubscribe from specific update types"""
         if websocket in self.manager.connection_metadata:
-            subscriptions = self.manager.connection_metadata[websocket].get('subscriptions', set())
-            subscriptions.discard(subscription_type)
+            self.manager.connection_metadata[websocket].subscriptions.discard(subscription_type)
             
-            await self.send_personal_message({
-                "type": "unsubscription_confirmed",
-                "subscription_type": subscription_type,
-                "timestamp": datetime.now().isoformat()
-            }, websocket)
+            self.manager.send_frame(websocket, encode_subscription_message(
+                "unsubscription_confirmed", UNSUBSCRIPTION_CONFIRMED_TEMPLATE, subscription_type
+            ))
 
     async def broadcast_task_update(self, task_data: dict):
         """Broadcast task update to relevant users"""
         # In a real implementation, you'd determine which users should receive this update
         # For now, broadcast to all users
-        message = {
-            "type": "task_update",
-            "data": task_data,
-            "timestamp": datetime.now().isoformat()
-        }
+        message = Envelope(type="task_update", data=task_data, timestamp=message_timestamp())
         await self.manager.broadcast_to_all(message)
 
     async def handle_collaboration(self, user_id: int, collaboration_data: dict):
@@ -273,7 +436,7 @@ class WebSocketService:
     async def start_ping_task(self):
         """Start the ping task to keep connections alive"""
         while True:
-            await asyncio.sleep(30)  # Ping every 30 seconds
+            await asyncio.sleep(PING_INTERVAL_SECONDS)
             await self.manager.ping_connections()
 
 
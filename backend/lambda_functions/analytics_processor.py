@@ -1,8 +1,13 @@
+import csv
+import io
 import json
+import orjson
 import boto3
 import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, Any, List
+from typing import Dict, Any, List, BinaryIO
 import logging
 
 # Set up logging
@@ -18,6 +23,17 @@ ses = boto3.client('ses')
 ANALYTICS_TABLE = os.environ.get('ANALYTICS_TABLE', 'taskflow-analytics')
 S3_BUCKET = os.environ.get('S3_BUCKET', 'taskflow-analytics-exports')
 SES_FROM_EMAIL = os.environ.get('SES_FROM_EMAIL', 'noreply@taskflow.com')
+ANALYTICS_TTL_HOURS = int(os.environ.get('ANALYTICS_TTL_HOURS', '24'))
+
+# Resolve handles once per container so warm invocations reuse them
+analytics_table = dynamodb.Table(ANALYTICS_TABLE)
+s3_list_objects_paginator = s3.get_paginator('list_objects_v2')
+
+# S3 DeleteObjects accepts at most 1000 keys per request
+S3_DELETE_BATCH_SIZE = 1000
+S3_DELETE_WORKERS = 8
+# CSV exports stay in memory up to this size, then spill to a temporary file
+CSV_SPOOL_MAX_SIZE = 8 * 1024 * 1024
 
 
 def lambda_handler(event, context):
@@ -66,8 +82,7 @@ def process_analytics_generation(event: Dict[str, Any]) -> Dict[str, Any]:
         analytics_data = generate_analytics_data(user_id, analytics_type, days)
         
         # Store in DynamoDB
-        table = dynamodb.Table(ANALYTICS_TABLE)
-        ttl = int((datetime.now() + timedelta(hours=24)).timestamp())
+        ttl = int((datetime.now() + timedelta(hours=ANALYTICS_TTL_HOURS)).timestamp())
         
         item = {
             'pk': f"USER#{user_id}",
@@ -78,7 +93,7 @@ def process_analytics_generation(event: Dict[str, Any]) -> Dict[str, Any]:
             'analytics_type': analytics_type
         }
         
-        table.put_item(Item=item)
+        analytics_table.put_item(Item=item)
         
         logger.info(f"Analytics data generated and stored for user {user_id}")
         
@@ -115,24 +130,30 @@ def process_data_export(event: Dict[str, Any]) -> Dict[str, Any]:
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         filename = f"user_{user_id}_export_{timestamp}.{export_format}"
         
-        # Convert to appropriate format
+        # Convert to appropriate format and upload to S3
         if export_format == 'json':
-            file_content = json.dumps(export_data, indent=2)
-            content_type = 'application/json'
+            # orjson produces bytes, which boto3 uploads without re-encoding
+            file_content = orjson.dumps(export_data, option=orjson.OPT_INDENT_2)
+            s3.put_object(
+                Bucket=S3_BUCKET,
+                Key=f"exports/{filename}",
+                Body=file_content,
+                ContentType='application/json'
+            )
         elif export_format == 'csv':
-            file_content = convert_to_csv(export_data)
-            content_type = 'text/csv'
+            # Spool the CSV to disk past CSV_SPOOL_MAX_SIZE and stream it to S3
+            with tempfile.SpooledTemporaryFile(max_size=CSV_SPOOL_MAX_SIZE) as buffer:
+                convert_to_csv(export_data, buffer)
+                buffer.seek(0)
+                s3.upload_fileobj(
+                    buffer,
+                    S3_BUCKET,
+                    f"exports/{filename}",
+                    ExtraArgs={'ContentType': 'text/csv'}
+                )
         else:
             raise ValueError(f"Unsupported export format: {export_format}")
         
-        # Upload to S3
-        s3.put_object(
-            Bucket=S3_BUCKET,
-            Key=f"exports/{filename}",
-            Body=file_content,
-            ContentType=content_type
-        )
-        
         # Generate presigned URL for download
         presigned_url = s3.generate_presigned_url(
             'get_object',
@@ -167,47 +188,79 @@ def process_cleanup(event: Dict[str, Any]) -> Dict[str, Any]:
         
         cutoff_date = datetime.now() - timedelta(days=days_old)
         
-        if cleanup_type == 'analytics' or cleanup_type == 'all':
-            # Cleanup old analytics data
-            table = dynamodb.Table(ANALYTICS_TABLE)
+        if (cleanup_type == 'analytics' or cleanup_type == 'all') and not event.get('purge_without_ttl', False):
+            # Analytics records are written with a ttl attribute and expired by
+            # DynamoDB TTL, so no table scan is needed
+            logger.info("Analytics records expire through DynamoDB TTL, skipping scan")
+        
+        elif cleanup_type == 'analytics' or cleanup_type == 'all':
+            # Cleanup old analytics data written without a ttl attribute
             
-            # Scan for old analytics data
-            response = table.scan(
-                FilterExpression='created_at < :cutoff_date',
-                ExpressionAttributeValues={
+            # Scan page by page (a single scan stops at 1 MB) and delete through
+            # batch_writer, which groups deletes into 25-item BatchWriteItem
+            # requests and retries unprocessed items
+            scan_kwargs = {
+                'FilterExpression': 'attribute_not_exists(#ttl) AND created_at < :cutoff_date',
+                'ProjectionExpression': 'pk, sk',
+                'ExpressionAttributeNames': {
+                    '#ttl': 'ttl'
+                },
+                'ExpressionAttributeValues': {
                     ':cutoff_date': cutoff_date.isoformat()
                 }
-            )
+            }
             
             deleted_count = 0
-            for item in response['Items']:
-                table.delete_item(
-                    Key={
-                        'pk': item['pk'],
-                        'sk': item['sk']
-                    }
-                )
-                deleted_count += 1
+            with analytics_table.batch_writer() as batch:
+                while True:
+                    response = analytics_table.scan(**scan_kwargs)
+                    for item in response['Items']:
+                        batch.delete_item(
+                            Key={
+                                'pk': item['pk'],
+                                'sk': item['sk']
+                            }
+                        )
+                        deleted_count += 1
+                    
+                    if 'LastEvaluatedKey' not in response:
+                        break
+                    scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
             
             logger.info(f"Cleaned up {deleted_count} old analytics records")
         
         if cleanup_type == 'exports' or cleanup_type == 'all':
-            # Cleanup old export files from S3
-            response = s3.list_objects_v2(
-                Bucket=S3_BUCKET,
-                Prefix='exports/'
-            )
+            # Cleanup old export files from S3, listing every page and deleting
+            # in batches of up to 1000 keys per DeleteObjects request. Deletes run
+            # on a thread pool so they overlap with listing the next page.
+            futures = []
+            with ThreadPoolExecutor(max_workers=S3_DELETE_WORKERS) as executor:
+                for page in s3_list_objects_paginator.paginate(Bucket=S3_BUCKET, Prefix='exports/'):
+                    expired_keys = [
+                        {'Key': obj['Key']}
+                        for obj in page.get('Contents', [])
+                        if obj['LastModified'].replace(tzinfo=None) < cutoff_date
+                    ]
+                    for start in range(0, len(expired_keys), S3_DELETE_BATCH_SIZE):
+                        batch = expired_keys[start:start + S3_DELETE_BATCH_SIZE]
+                        futures.append((len(batch), executor.submit(
+                            s3.delete_objects,
+                            Bucket=S3_BUCKET,
+                            Delete={'Objects': batch, 'Quiet': True}
+                        )))
             
             deleted_count = 0
-            if 'Contents' in response:
-                for obj in response['Contents']:
-                    if obj['LastModified'].replace(tzinfo=None) < cutoff_date:
-                        s3.delete_object(
-                            Bucket=S3_BUCKET,
-                            Key=obj['Key']
-                        )
-                        deleted_count += 1
+            failed_count = 0
+            for batch_size, future in futures:
+                # Quiet mode only reports the keys that could not be deleted
+                errors = future.result().get('Errors', [])
+                for error in errors:
+                    logger.warning(f"Failed to delete {error['Key']}: {error.get('Code')} {error.get('Message')}")
+                failed_count += len(errors)
+                deleted_count += batch_size - len(errors)
             
+            if failed_count:
+                logger.warning(f"Failed to delete {failed_count} old export files")
             logger.info(f"Cleaned up {deleted_count} old export files")
         
         return {
@@ -266,17 +319,14 @@ def generate_export_data(user_id: int, days: int) -> Dict[str, Any]:
     }
 
 
-def convert_to_csv(data: Dict[str, Any]) -> str:
+def convert_to_csv(data: Dict[str, Any], output: BinaryIO) -> None:
     """
-    Convert data to CSV format
+    Write data in CSV format to a binary file object
     """
-    import csv
-    import io
-    
-    output = io.StringIO()
+    text_output = io.TextIOWrapper(output, encoding='utf-8', newline='')
     
     # Write summary
-    writer = csv.writer(output)
+    writer = csv.writer(text_output)
     writer.writerow(['Summary'])
     writer.writerow(['Total Tasks', data['summary']['total_tasks']])
     writer.writerow(['Total Notifications', data['summary']['total_notifications']])
@@ -285,17 +335,19 @@ def convert_to_csv(data: Dict[str, Any]) -> str:
     # Write tasks
     writer.writerow(['Tasks'])
     if data['tasks']:
-        writer.writerow(data['tasks'][0].keys())  # Header
-        for task in data['tasks']:
-            writer.writerow(task.values())
+        task_writer = csv.DictWriter(text_output, fieldnames=list(data['tasks'][0].keys()))
+        task_writer.writeheader()
+        task_writer.writerows(data['tasks'])
     
     writer.writerow([])
     
     # Write notifications
     writer.writerow(['Notifications'])
     if data['notifications']:
-        writer.writerow(data['notifications'][0].keys())  # Header
-        for notification in data['notifications']:
-            writer.writerow(notification.values())
+        notification_writer = csv.DictWriter(text_output, fieldnames=list(data['notifications'][0].keys()))
+        notification_writer.writeheader()
+        notification_writer.writerows(data['notifications'])
     
-    return output.getvalue()
+    # Hand the underlying buffer back to the caller without closing it
+    text_output.flush()
+    text_output.detach()
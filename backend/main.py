@@ -1,4 +1,5 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
@@ -11,6 +12,13 @@ from core.logging_config import setup_logging
 from api import users, products, auth, tasks, files, notifications, analytics, websocket, advanced_tasks, cached_tasks
 from models import user
 
+try:
+    # uvloop ships with uvicorn[standard] on Linux/macOS; Windows falls back to asyncio
+    import uvloop
+    uvloop.install()
+except ImportError:
+    pass
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -32,7 +40,8 @@ app = FastAPI(
     title="KF API",
     description="FastAPI backend with AWS integration",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Error handling middleware
@@ -1,23 +1,49 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, BigInteger
+import uuid
+
+from sqlalchemy import Column, Integer, SmallInteger, String, DateTime, ForeignKey, BigInteger, Index, Identity, Uuid
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-from core.database import Base
+from core.database import Base, BigIntegerType
+
+
+# s3_bucket_id -> bucket name; ids are stored on rows, so only ever append
+S3_BUCKETS = {1: "taskflow-files"}
+DEFAULT_S3_BUCKET_ID = 1
+
+
+def task_file_key(task_id: int, object_uuid: uuid.UUID) -> str:
+    """Build the S3 object key for a task file"""
+    return f"tasks/{task_id}/{object_uuid}"
 
 
 class TaskFile(Base):
     __tablename__ = "task_files"
+    __table_args__ = (
+        Index("ix_task_files_task", "task_id"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(BigIntegerType, Identity(always=False, cache=50), primary_key=True)
     filename = Column(String(255), nullable=False)
     original_filename = Column(String(255), nullable=False)
     file_size = Column(BigInteger, nullable=False)
     content_type = Column(String(100), nullable=False)
-    s3_key = Column(String(500), nullable=False)  # S3 object key
-    s3_bucket = Column(String(100), nullable=False)
-    task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False)
+    s3_bucket_id = Column(SmallInteger, nullable=False, default=DEFAULT_S3_BUCKET_ID)
+    # NULL only for files uploaded before 011 whose old key had no uuid in it
+    s3_object_uuid = Column(Uuid, nullable=True, unique=True, default=uuid.uuid4)
+    # Key of files uploaded before 011, whose objects still live at the old users/... keys
+    legacy_s3_key = Column(String(500), nullable=True)
+    task_id = Column(BigIntegerType, ForeignKey("tasks.id"), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
     task = relationship("Task", back_populates="files")
     user = relationship("User", back_populates="files")
+
+    @property
+    def s3_key(self) -> str:
+        return self.legacy_s3_key or task_file_key(self.task_id, self.s3_object_uuid)
+
+    @property
+    def s3_bucket(self) -> str:
+        return S3_BUCKETS[self.s3_bucket_id]
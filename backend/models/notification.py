@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Enum, Text, JSON
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Index, Identity, FetchedValue, PrimaryKeyConstraint, event, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-from core.database import Base
+from core.database import Base, JSONBType, EnumAsString, BigIntegerType
+from datetime import date
 import enum
 
 
@@ -23,27 +24,66 @@ class NotificationStatus(str, enum.Enum):
 
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        # A partitioned table's primary key must include created_at, so on
+        # PostgreSQL (id, created_at) is added after create; see below
+        PrimaryKeyConstraint("id").ddl_if(dialect="sqlite"),
+        # Pending-notification poller: per-user, by status, oldest first
+        Index("ix_notifications_user_status_created", "user_id", "status", "created_at"),
+        # Monthly partitions named notifications_YYYY_MM
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(BigIntegerType, Identity(always=False, cache=50))
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    type = Column(Enum(NotificationType), nullable=False)
+    type = Column(EnumAsString(NotificationType), nullable=False)
     title = Column(String(255), nullable=False)
     message = Column(Text, nullable=False)
-    status = Column(Enum(NotificationStatus), default=NotificationStatus.PENDING, nullable=False)
+    status = Column(EnumAsString(NotificationStatus), default=NotificationStatus.PENDING.value, nullable=False)
     email_sent = Column(Boolean, default=False)
     email_sent_at = Column(DateTime(timezone=True), nullable=True)
-    notification_metadata = Column(JSON, nullable=True)  # Store additional data like task_id, etc.
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Python attribute can't be named `metadata` (reserved by declarative); DB column keeps the name
+    extra_data = Column("metadata", JSONBType, nullable=True)  # Store additional data like task_id, etc.
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), server_onupdate=FetchedValue(), onupdate=func.now(), nullable=False)
 
     # Relationships
-    user = relationship("User", back_populates="notifications")
+    user = relationship("User", back_populates="notifications", lazy="raise_on_sql")
+
+
+def month_start(day: date, months: int = 0) -> date:
+    """First day of the month `months` away from `day`"""
+    month_index = day.year * 12 + day.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def notification_partition_name(month: date) -> str:
+    return f"notifications_{month:%Y_%m}"
+
+
+def create_notification_partition(connection, month: date) -> None:
+    """Create the monthly notifications partition starting at `month` if it is missing"""
+    connection.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {notification_partition_name(month)} "
+        f"PARTITION OF notifications "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{month_start(month, 1).isoformat()}')"
+    ))
+
+
+@event.listens_for(Notification.__table__, "after_create")
+def _setup_notification_partitions(target, connection, **kw):
+    if connection.dialect.name != "postgresql":
+        return
+    connection.execute(text("ALTER TABLE notifications ADD PRIMARY KEY (id, created_at)"))
+    today = date.today()
+    for months in (0, 1):
+        create_notification_partition(connection, month_start(today, months))
 
 
 class NotificationPreference(Base):
     __tablename__ = "notification_preferences"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, unique=True)
     email_enabled = Column(Boolean, default=True, nullable=False)
     task_reminders = Column(Boolean, default=True, nullable=False)
@@ -54,21 +94,21 @@ class NotificationPreference(Base):
     file_notifications = Column(Boolean, default=False, nullable=False)
     reminder_frequency = Column(String(20), default="daily", nullable=False)  # daily, weekly, never
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), server_onupdate=FetchedValue(), onupdate=func.now(), nullable=False)
 
     # Relationships
-    user = relationship("User", back_populates="notification_preferences")
+    user = relationship("User", back_populates="notification_preferences", lazy="raise_on_sql")
 
 
 class EmailTemplate(Base):
     __tablename__ = "email_templates"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String(100), nullable=False, unique=True)
     subject = Column(String(255), nullable=False)
     html_content = Column(Text, nullable=False)
     text_content = Column(Text, nullable=True)
-    template_type = Column(Enum(NotificationType), nullable=False)
+    template_type = Column(EnumAsString(NotificationType), nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), server_onupdate=FetchedValue(), onupdate=func.now(), nullable=False)
@@ -1,7 +1,7 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Enum, Text, JSON
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Index, UniqueConstraint, Identity, text, FetchedValue
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-from core.database import Base
+from core.database import Base, JSONBType, EnumAsString, BigIntegerType
 import enum
 
 
@@ -20,88 +20,104 @@ class TaskPriority(str, enum.Enum):
 
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        Index("ix_tasks_tags_gin", "tags", postgresql_using="gin", postgresql_ops={"tags": "jsonb_path_ops"}),
+        # Per-user task list: filtered by status, ordered by due date / newest first
+        Index("ix_tasks_user_status_due", "user_id", "status", "due_date"),
+        Index("ix_tasks_user_created_desc", "user_id", text("created_at DESC")),
+        Index("ix_tasks_user_category", "user_id", "category_id"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(BigIntegerType, Identity(always=False, cache=50), primary_key=True)
     title = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
-    status = Column(Enum(TaskStatus), default=TaskStatus.TODO, nullable=False)
-    priority = Column(Enum(TaskPriority), default=TaskPriority.MEDIUM, nullable=False)
+    status = Column(EnumAsString(TaskStatus), default=TaskStatus.TODO.value, nullable=False)
+    priority = Column(EnumAsString(TaskPriority), default=TaskPriority.MEDIUM.value, nullable=False)
     due_date = Column(DateTime(timezone=True), nullable=True)
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    parent_task_id = Column(Integer, ForeignKey("tasks.id"), nullable=True)  # For subtasks
+    parent_task_id = Column(BigIntegerType, ForeignKey("tasks.id"), nullable=True)  # For subtasks
     estimated_duration = Column(Integer, nullable=True)  # Estimated duration in minutes
     actual_duration = Column(Integer, nullable=True)  # Actual duration in minutes
-    tags = Column(JSON, nullable=True)  # Store tags as JSON array
+    tags = Column(JSONBType, nullable=True)  # Store tags as JSON array
     is_template = Column(Boolean, default=False, nullable=False)  # For task templates
     template_name = Column(String(255), nullable=True)  # Name of the template
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), server_onupdate=FetchedValue(), onupdate=func.now(), nullable=False)
 
     # Relationships
-    category = relationship("Category", back_populates="tasks")
-    user = relationship("User", back_populates="tasks")
-    files = relationship("TaskFile", back_populates="task")
+    category = relationship("Category", back_populates="tasks", lazy="raise_on_sql")
+    user = relationship("User", back_populates="tasks", lazy="raise_on_sql")
+    files = relationship("TaskFile", back_populates="task", lazy="raise_on_sql")
     
     # Self-referential relationships for subtasks and dependencies
-    parent_task = relationship("Task", remote_side=[id], backref="subtasks")
+    parent_task = relationship("Task", remote_side=[id], back_populates="subtasks", lazy="raise_on_sql")
+    subtasks = relationship("Task", back_populates="parent_task", lazy="raise_on_sql")
     dependencies = relationship(
         "TaskDependency",
         foreign_keys="TaskDependency.task_id",
-        back_populates="task"
+        back_populates="task",
+        lazy="raise_on_sql"
     )
     dependents = relationship(
         "TaskDependency", 
         foreign_keys="TaskDependency.depends_on_task_id",
-        back_populates="depends_on_task"
+        back_populates="depends_on_task",
+        lazy="raise_on_sql"
     )
 
 
 class Category(Base):
     __tablename__ = "categories"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String(100), nullable=False)
     color = Column(String(7), default="#3498db", nullable=False)  # Hex color code
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
-    tasks = relationship("Task", back_populates="category")
-    user = relationship("User", back_populates="categories")
+    tasks = relationship("Task", back_populates="category", lazy="raise_on_sql")
+    user = relationship("User", back_populates="categories", lazy="raise_on_sql")
 
 
 class TaskDependency(Base):
     __tablename__ = "task_dependencies"
+    __table_args__ = (
+        UniqueConstraint("task_id", "depends_on_task_id", name="uq_task_dep"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
-    task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False)
-    depends_on_task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False)
+    id = Column(Integer, primary_key=True)
+    task_id = Column(BigIntegerType, ForeignKey("tasks.id"), nullable=False)
+    depends_on_task_id = Column(BigIntegerType, ForeignKey("tasks.id"), nullable=False)
     dependency_type = Column(String(20), default="finish_to_start", nullable=False)  # finish_to_start, start_to_start, etc.
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
-    task = relationship("Task", foreign_keys=[task_id], back_populates="dependencies")
-    depends_on_task = relationship("Task", foreign_keys=[depends_on_task_id], back_populates="dependents")
+    task = relationship("Task", foreign_keys=[task_id], back_populates="dependencies", lazy="raise_on_sql")
+    depends_on_task = relationship("Task", foreign_keys=[depends_on_task_id], back_populates="dependents", lazy="raise_on_sql")
 
 
 class TaskTemplate(Base):
     __tablename__ = "task_templates"
+    __table_args__ = (
+        Index("ix_task_templates_tags_gin", "tags", postgresql_using="gin", postgresql_ops={"tags": "jsonb_path_ops"}),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     estimated_duration = Column(Integer, nullable=True)
-    priority = Column(Enum(TaskPriority), default=TaskPriority.MEDIUM, nullable=False)
-    tags = Column(JSON, nullable=True)
-    template_data = Column(JSON, nullable=True)  # Store template structure
+    priority = Column(EnumAsString(TaskPriority), default=TaskPriority.MEDIUM.value, nullable=False)
+    tags = Column(JSONBType, nullable=True)
+    template_data = Column(JSONBType, nullable=True)  # Store template structure
     is_public = Column(Boolean, default=False, nullable=False)
     usage_count = Column(Integer, default=0, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), server_onupdate=FetchedValue(), onupdate=func.now(), nullable=False)
 
     # Relationships
-    category = relationship("Category")
-    user = relationship("User")
+    category = relationship("Category", lazy="raise_on_sql")
+    user = relationship("User", lazy="raise_on_sql")
@@ -1,4 +1,18 @@
 # Schemas module initialization
+from pydantic import BaseModel, ConfigDict
+
+
+class FastBase(BaseModel):
+    """Base for response/output schemas: built from ORM rows, never mutated after validation"""
+    model_config = ConfigDict(
+        from_attributes=True,
+        frozen=True,
+        extra="ignore",
+        populate_by_name=True,
+        str_strip_whitespace=True,
+    )
+
+
 from .auth import *
 from .task import *
 from .file import *
@@ -1,9 +1,10 @@
-from pydantic import BaseModel
 from typing import Dict, Any, List, Optional
 from datetime import datetime
+from pydantic import Field
+from schemas import FastBase
 
 
-class AnalyticsOverview(BaseModel):
+class AnalyticsOverview(FastBase):
     total_tasks: int
     completed_tasks: int
     overdue_tasks: int
@@ -16,14 +17,14 @@ class AnalyticsOverview(BaseModel):
     period_days: int
 
 
-class TaskTrends(BaseModel):
+class TaskTrends(FastBase):
     created_tasks: Dict[str, int]
     completed_tasks: Dict[str, int]
     granularity: str
     period_days: int
 
 
-class CategoryAnalytics(BaseModel):
+class CategoryAnalytics(FastBase):
     category_id: int
     category_name: str
     category_color: str
@@ -33,22 +34,23 @@ class CategoryAnalytics(BaseModel):
     completion_rate: float
 
 
-class ProductivityMetrics(BaseModel):
+class ProductivityMetrics(FastBase):
     average_completion_time_hours: float
-    hourly_productivity: Dict[int, int]
-    daily_productivity: Dict[int, int]
+    # Fixed-size histograms: index = hour of day (0-23) / day of week (0 = Sunday)
+    hourly_productivity: List[int] = Field(..., min_length=24, max_length=24)
+    daily_productivity: List[int] = Field(..., min_length=7, max_length=7)
     current_streak_days: int
     period_days: int
 
 
-class TimeAnalytics(BaseModel):
-    tasks_by_hour: Dict[int, int]
-    tasks_by_day_of_week: Dict[int, int]
+class TimeAnalytics(FastBase):
+    tasks_by_hour: List[int] = Field(..., min_length=24, max_length=24)
+    tasks_by_day_of_week: List[int] = Field(..., min_length=7, max_length=7)
     overdue_trends: Dict[str, int]
     period_days: int
 
 
-class ExportData(BaseModel):
+class ExportData(FastBase):
     data: Dict[str, Any]
     format: str
     export_date: datetime
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, EmailStr, validator
 from typing import Optional
 from datetime import datetime
+from schemas import FastBase
 
 
 class UserBase(BaseModel):
@@ -18,15 +19,12 @@ class UserCreate(UserBase):
         return v
 
 
-class UserResponse(UserBase):
+class UserResponse(UserBase, FastBase):
     id: int
     is_active: bool
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
-
 
 class Token(BaseModel):
     access_token: str
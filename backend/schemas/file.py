@@ -1,6 +1,9 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter, computed_field
 from typing import Optional, List
 from datetime import datetime
+from uuid import UUID
+from schemas import FastBase
+from models.file import S3_BUCKETS, task_file_key
 
 
 class TaskFileBase(BaseModel):
@@ -10,23 +13,34 @@ class TaskFileBase(BaseModel):
     content_type: str
 
 
-class TaskFileResponse(TaskFileBase):
+class TaskFileResponse(TaskFileBase, FastBase):
     id: int
     task_id: int
     user_id: int
-    s3_key: str
-    s3_bucket: str
+    s3_bucket_id: int
+    s3_object_uuid: Optional[UUID] = None
+    legacy_s3_key: Optional[str] = Field(None, exclude=True)
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    @computed_field
+    @property
+    def s3_key(self) -> str:
+        return self.legacy_s3_key or task_file_key(self.task_id, self.s3_object_uuid)
 
+    @computed_field
+    @property
+    def s3_bucket(self) -> str:
+        return S3_BUCKETS[self.s3_bucket_id]
 
-class TaskFileListResponse(BaseModel):
+
+class TaskFileListResponse(FastBase):
     files: List[TaskFileResponse]
     total: int
 
 
+TASK_FILE_RESPONSE_LIST_ADAPTER = TypeAdapter(List[TaskFileResponse])
+
+
 class FileUploadResponse(BaseModel):
     file_id: int
     filename: str
@@ -1,14 +1,22 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional, Dict, Any
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, AliasChoices, TypeAdapter
+from typing import Optional, List, Dict, Any
 from datetime import datetime
 from models.notification import NotificationType, NotificationStatus
+from schemas import FastBase
 
 
 class NotificationBase(BaseModel):
+    model_config = ConfigDict(populate_by_name=True, from_attributes=True)
+
     type: NotificationType
     title: str
     message: str
-    metadata: Optional[Dict[str, Any]] = None
+    # Exposed as "metadata" on the API; read from Notification.extra_data on ORM objects
+    extra_data: Optional[Dict[str, Any]] = Field(
+        None,
+        validation_alias=AliasChoices("extra_data", "metadata"),
+        serialization_alias="metadata",
+    )
 
 
 class NotificationCreate(NotificationBase):
@@ -21,7 +29,7 @@ class NotificationUpdate(BaseModel):
     email_sent_at: Optional[datetime] = None
 
 
-class NotificationResponse(NotificationBase):
+class NotificationResponse(NotificationBase, FastBase):
     id: int
     user_id: int
     status: NotificationStatus
@@ -30,8 +38,8 @@ class NotificationResponse(NotificationBase):
     created_at: datetime
     updated_at: Optional[datetime]
 
-    class Config:
-        from_attributes = True
+
+NOTIFICATION_RESPONSE_LIST_ADAPTER = TypeAdapter(List[NotificationResponse])
 
 
 class NotificationPreferenceBase(BaseModel):
@@ -60,15 +68,12 @@ class NotificationPreferenceUpdate(BaseModel):
     reminder_frequency: Optional[str] = None
 
 
-class NotificationPreferenceResponse(NotificationPreferenceBase):
+class NotificationPreferenceResponse(NotificationPreferenceBase, FastBase):
     id: int
     user_id: int
     created_at: datetime
     updated_at: Optional[datetime]
 
-    class Config:
-        from_attributes = True
-
 
 class EmailTemplateBase(BaseModel):
     name: str
@@ -92,14 +97,11 @@ class EmailTemplateUpdate(BaseModel):
     is_active: Optional[bool] = None
 
 
-class EmailTemplateResponse(EmailTemplateBase):
+class EmailTemplateResponse(EmailTemplateBase, FastBase):
     id: int
     created_at: datetime
     updated_at: Optional[datetime]
 
-    class Config:
-        from_attributes = True
-
 
 class SendNotificationRequest(BaseModel):
     user_id: int
@@ -112,3 +114,8 @@ class SendNotificationRequest(BaseModel):
 class UnsubscribeRequest(BaseModel):
     email: EmailStr
     token: str
+
+
+# Build the core schemas now rather than on the first request that uses them
+for _model in (NotificationResponse, NotificationPreferenceResponse, EmailTemplateResponse):
+    _model.model_rebuild(force=True)
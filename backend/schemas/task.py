@@ -1,7 +1,11 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from models.task import TaskStatus, TaskPriority
+from schemas import FastBase
+
+
+HEX_COLOR_PATTERN = r"^#[0-9A-Fa-f]{6}$"
 
 
 class TaskBase(BaseModel):
@@ -48,7 +52,7 @@ class TaskPriorityUpdate(BaseModel):
 
 class CategoryBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=100)
-    color: str = Field(default="#3498db", pattern=r"^#[0-9A-Fa-f]{6}$")
+    color: str = Field(default="#3498db", pattern=HEX_COLOR_PATTERN)
 
 
 class CategoryCreate(CategoryBase):
@@ -57,36 +61,35 @@ class CategoryCreate(CategoryBase):
 
 class CategoryUpdate(BaseModel):
     name: Optional[str] = Field(None, min_length=1, max_length=100)
-    color: Optional[str] = Field(None, pattern=r"^#[0-9A-Fa-f]{6}$")
+    color: Optional[str] = Field(None, pattern=HEX_COLOR_PATTERN)
 
 
-class CategoryResponse(CategoryBase):
+class CategoryResponse(CategoryBase, FastBase):
     id: int
     user_id: int
     created_at: datetime
 
-    class Config:
-        from_attributes = True
-
 
-class TaskResponse(TaskBase):
+class TaskResponse(TaskBase, FastBase):
     id: int
     user_id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
     category: Optional[CategoryResponse] = None
 
-    class Config:
-        from_attributes = True
 
-
-class TaskListResponse(BaseModel):
+class TaskListResponse(FastBase):
     tasks: List[TaskResponse]
     total: int
     page: int
     per_page: int
 
 
+# Validates a whole page of ORM rows in one pydantic-core call
+TASK_RESPONSE_LIST_ADAPTER = TypeAdapter(List[TaskResponse])
+CATEGORY_RESPONSE_LIST_ADAPTER = TypeAdapter(List[CategoryResponse])
+
+
 # Task Dependency Schemas
 class TaskDependencyBase(BaseModel):
     task_id: int
@@ -98,13 +101,10 @@ class TaskDependencyCreate(TaskDependencyBase):
     pass
 
 
-class TaskDependencyResponse(TaskDependencyBase):
+class TaskDependencyResponse(TaskDependencyBase, FastBase):
     id: int
     created_at: datetime
 
-    class Config:
-        from_attributes = True
-
 
 # Task Template Schemas
 class TaskTemplateBase(BaseModel):
@@ -133,16 +133,13 @@ class TaskTemplateUpdate(BaseModel):
     is_public: Optional[bool] = None
 
 
-class TaskTemplateResponse(TaskTemplateBase):
+class TaskTemplateResponse(TaskTemplateBase, FastBase):
     id: int
     user_id: int
     usage_count: int
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
-
 
 # Advanced Task Management Schemas
 class TaskWithSubtasks(TaskResponse):
@@ -182,3 +179,9 @@ class TaskSearchRequest(BaseModel):
     size: int = 10
     sort_by: str = "created_at"
     sort_order: str = "desc"
+
+
+# Build the core schemas now rather than on the first request that uses them
+for _model in (CategoryResponse, TaskResponse, TaskListResponse, TaskDependencyResponse,
+               TaskTemplateResponse, TaskWithSubtasks):
+    _model.model_rebuild(force=True)
@@ -0,0 +1,126 @@
+import os
+import pytest
+from functools import lru_cache
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import configure_mappers, sessionmaker
+from sqlalchemy.pool import StaticPool
+from core.database import get_db, Base
+from main import app
+from models.user import User
+from api.auth import create_access_token
+
+# Test database setup: one shared in-memory database per pytest-xdist worker, no disk I/O
+XDIST_WORKER = os.environ.get("PYTEST_XDIST_WORKER", "main")
+SQLALCHEMY_DATABASE_URL = f"sqlite:///file:tests_{XDIST_WORKER}?mode=memory&cache=shared&uri=true"
+# Test-only pool setup: StaticPool hands every checkout the same single connection, so SQLite
+# never sees two connections contending for its lock; the busy timeout makes any stray
+# contention wait instead of raising "database is locked"
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False, "timeout": 30},
+    poolclass=StaticPool,
+)
+
+
+def configure_sqlite(engine):
+    """Register the connection setup shared by every SQLite test engine"""
+    @event.listens_for(engine, "connect")
+    def _disable_durability(dbapi_connection, connection_record):
+        # Let SQLAlchemy emit BEGIN itself: pysqlite's implicit transactions turn RELEASE SAVEPOINT into a commit
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=MEMORY")
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def _begin(connection):
+        connection.exec_driver_sql("BEGIN")
+
+configure_sqlite(engine)
+
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# bcrypt is deliberately slow, so the fixture password "password123" is stored pre-hashed
+PRECOMPUTED_HASH = "$2b$12$aDw1KX.uJpR4WeYAxvd0O.RWto4CLuA3tXPBeWuysNpVI5IZ0iyD2"
+
+# JWT signing is the other per-fixture cost; sign once per email
+@lru_cache(maxsize=None)
+def auth_token(email):
+    return create_access_token({"sub": email})
+
+@pytest.fixture(scope="session", autouse=True)
+def _configure_mappers():
+    """Resolve every model relationship once, before the first test's fixtures touch the ORM"""
+    configure_mappers()
+
+@pytest.fixture(scope="session")
+def database():
+    """Schema created once per run; yields the engine for fixtures that seed committed data"""
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    Base.metadata.drop_all(bind=engine)
+
+@pytest.fixture
+def connection(database):
+    """One transaction per test, rolled back afterwards so tests never see each other's rows"""
+    connection = engine.connect()
+    transaction = connection.begin()
+    yield connection
+    transaction.rollback()
+    connection.close()
+
+@pytest.fixture(scope="session")
+def _client():
+    # Not entered as a context manager: the app lifespan would run create_all on the real database
+    return TestClient(app)
+
+@pytest.fixture
+def client(_client, connection):
+    def override_get_db():
+        try:
+            db = TestingSessionLocal(bind=connection, join_transaction_mode="rollback_only")
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    yield _client
+    app.dependency_overrides.pop(get_db, None)
+
+@pytest.fixture
+def db_session(connection):
+    """Test-side session: commits and rollbacks act on a SAVEPOINT, never on the outer transaction"""
+    # create_savepoint is SQLAlchemy 2.0's built-in form of the begin_nested/restart-savepoint recipe.
+    # Request sessions stay rollback_only: concurrent requests would release each other's savepoints
+    session = TestingSessionLocal(bind=connection, join_transaction_mode="create_savepoint")
+    yield session
+    session.close()
+
+@pytest.fixture(scope="session")
+def create_user(database):
+    """Commit a user outside the per-test transaction, so it survives every rollback"""
+    def _create_user(email, full_name):
+        session = TestingSessionLocal()
+        user = User(
+            email=email,
+            hashed_password=PRECOMPUTED_HASH,
+            full_name=full_name,
+            is_active=True
+        )
+        session.add(user)
+        session.commit()
+        session.refresh(user)
+        session.close()
+        return user
+    return _create_user
+
+@pytest.fixture(scope="session")
+def test_user(create_user):
+    return create_user("test@example.com", "Test User")
+
+@pytest.fixture
+def auth_headers(test_user):
+    return {"Authorization": f"Bearer {auth_token(test_user.email)}"}
@@ -1,3 +1,4 @@
+import os
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
@@ -12,8 +13,9 @@ from models.notification import Notification
 from models.file import TaskFile
 from api.auth import get_password_hash, verify_password, create_access_token, authenticate_user
 
-# Test database setup
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+# Test database setup: a private in-memory database per pytest-xdist worker, so parallel runs never share rows
+XDIST_WORKER = os.environ.get("PYTEST_XDIST_WORKER", "main")
+SQLALCHEMY_DATABASE_URL = f"sqlite:///file:test_auth_{XDIST_WORKER}?mode=memory&cache=shared&uri=true"
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
     connect_args={"check_same_thread": False},
@@ -28,12 +30,22 @@ def override_get_db():
     finally:
         db.close()
 
-app.dependency_overrides[get_db] = override_get_db
+@pytest.fixture(scope="module", autouse=True)
+def _override_db():
+    # Installed only while this module's tests run, so other modules never see this database
+    app.dependency_overrides[get_db] = override_get_db
+    yield
+    app.dependency_overrides.pop(get_db, None)
+
+@pytest.fixture(scope="module")
+def _client():
+    # One client for the module; each test still gets a freshly built schema from client
+    return TestClient(app)
 
 @pytest.fixture
-def client():
+def client(_client):
     Base.metadata.create_all(bind=engine)
-    yield TestClient(app)
+    yield _client
     Base.metadata.drop_all(bind=engine)
 
 @pytest.fixture
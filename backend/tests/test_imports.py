@@ -0,0 +1,12 @@
+import schemas.task
+from schemas.task import TaskResponse, TaskWithSubtasks
+
+
+class TestSchemaImports:
+    def test_task_response_is_extended_schema(self):
+        assert "parent_task_id" in TaskResponse.model_fields
+        assert issubclass(TaskWithSubtasks, TaskResponse)
+
+    def test_task_schemas_resolve_to_single_module(self):
+        assert TaskResponse.__module__ == "schemas.task"
+        assert schemas.task.__file__.endswith("schemas/task.py")
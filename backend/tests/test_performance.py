@@ -1,97 +1,78 @@
+import gc
 import pytest
 import time
+import tracemalloc
 import asyncio
-from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
-from core.database import get_db, Base
+import statistics
+import httpx
+from sqlalchemy import select
+from sqlalchemy.orm import Session
 from main import app
-from models.user import User
 from models.task import Task, Category
-from api.auth import get_password_hash, create_access_token
-import concurrent.futures
 
-# Test database setup
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
-)
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+@pytest.fixture(scope="session")
+def test_user(create_user):
+    # Separate user so the committed test_data below stays invisible to other modules
+    return create_user("perf@example.com", "Performance Test User")
 
-def override_get_db():
-    try:
-        db = TestingSessionLocal()
-        yield db
-    finally:
-        db.close()
+def measure(fn, n=5):
+    """Run fn n times and return the p95 duration in seconds"""
+    samples = []
+    for _ in range(n):
+        start_time = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start_time)
+    return sorted(samples)[int(0.95 * n)]
 
-app.dependency_overrides[get_db] = override_get_db
-
-@pytest.fixture
-def client():
-    Base.metadata.create_all(bind=engine)
-    yield TestClient(app)
-    Base.metadata.drop_all(bind=engine)
-
-@pytest.fixture
-def db_session():
-    session = TestingSessionLocal()
-    yield session
-    session.close()
-
-@pytest.fixture
-def test_user(db_session):
-    user = User(
-        email="perf@example.com",
-        hashed_password=get_password_hash("password123"),
-        full_name="Performance Test User",
-        is_active=True
-    )
-    db_session.add(user)
-    db_session.commit()
-    db_session.refresh(user)
-    return user
-
-@pytest.fixture
-def auth_headers(test_user):
-    token = create_access_token({"sub": test_user.email})
-    return {"Authorization": f"Bearer {token}"}
-
-@pytest.fixture
-def test_data(db_session, test_user):
-    """Create test data for performance testing"""
+async def _driver(ac, url, headers, n, concurrency):
+    """Issue n GETs with at most `concurrency` in flight; returns (status code, latency) pairs"""
+    semaphore = asyncio.Semaphore(concurrency)
     
-    # Create categories
-    categories = []
-    for i in range(5):
-        category = Category(
-            name=f"Category {i}",
-            color=f"#3498db",
-            user_id=test_user.id
-        )
-        db_session.add(category)
-        categories.append(category)
+    async def one():
+        async with semaphore:
+            start_time = time.perf_counter()
+            response = await ac.get(url, headers=headers)
+            return response.status_code, time.perf_counter() - start_time
     
-    db_session.commit()
+    return await asyncio.gather(*[one() for _ in range(n)])
+
+@pytest.fixture(scope="session")
+def test_data(database, test_user):
+    """Create test data for performance testing (read-only, committed once per run)"""
+    session = Session(bind=database)
     
-    # Create tasks
-    tasks = []
-    for i in range(100):
-        task = Task(
-            title=f"Performance Task {i}",
-            description=f"Description for performance test task {i}",
-            status="todo" if i % 3 == 0 else "in_progress" if i % 3 == 1 else "done",
-            priority="low" if i % 4 == 0 else "medium" if i % 4 == 1 else "high" if i % 4 == 2 else "urgent",
-            category_id=categories[i % 5].id,
-            user_id=test_user.id
-        )
-        db_session.add(task)
-        tasks.append(task)
+    # Core-level executemany: no per-row ORM flush or identity-map bookkeeping
+    session.execute(
+        Category.__table__.insert(),
+        [
+            {"name": f"Category {i}", "color": "#3498db", "user_id": test_user.id}
+            for i in range(5)
+        ]
+    )
+    categories = session.execute(
+        select(Category.id).where(Category.user_id == test_user.id).order_by(Category.id)
+    ).all()
+    
+    session.execute(
+        Task.__table__.insert(),
+        [
+            {
+                "title": f"Performance Task {i}",
+                "description": f"Description for performance test task {i}",
+                "status": "todo" if i % 3 == 0 else "in_progress" if i % 3 == 1 else "done",
+                "priority": "low" if i % 4 == 0 else "medium" if i % 4 == 1 else "high" if i % 4 == 2 else "urgent",
+                "category_id": categories[i % 5].id,
+                "user_id": test_user.id
+            }
+            for i in range(100)
+        ]
+    )
+    tasks = session.execute(
+        select(Task.id).where(Task.user_id == test_user.id).order_by(Task.id)
+    ).all()
     
-    db_session.commit()
+    session.commit()
+    session.close()
     return {"categories": categories, "tasks": tasks}
 
 class TestAPIPerformance:
@@ -100,28 +81,26 @@ class TestAPIPerformance:
     def test_task_list_performance(self, client, auth_headers, test_data):
         """Test task list endpoint performance"""
         
-        start_time = time.time()
-        
-        response = client.get("/api/tasks?page=1&per_page=20", headers=auth_headers)
-        
-        end_time = time.time()
-        response_time = end_time - start_time
+        responses = []
+        response_time = measure(
+            lambda: responses.append(client.get("/api/tasks?page=1&per_page=20", headers=auth_headers))
+        )
         
-        assert response.status_code == 200
-        assert response_time < 0.5  # Should respond within 500ms
+        assert all(response.status_code == 200 for response in responses)
+        assert response_time < 0.5  # p95 should be within 500ms
         
-        data = response.json()
+        data = responses[-1].json()
         assert len(data["tasks"]) == 20
         assert data["total"] == 100
     
     def test_task_search_performance(self, client, auth_headers, test_data):
         """Test task search performance"""
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         response = client.get("/api/tasks?page=1&per_page=10&status=todo", headers=auth_headers)
         
-        end_time = time.time()
+        end_time = time.perf_counter()
         response_time = end_time - start_time
         
         assert response.status_code == 200
@@ -133,61 +112,53 @@ class TestAPIPerformance:
     def test_cached_endpoints_performance(self, client, auth_headers, test_data):
         """Test cached endpoints performance"""
         
-        # First request (cache miss)
-        start_time = time.time()
+        # First request (cache miss) fills the cache; its cold-start time is not asserted on
         response1 = client.get("/api/cached/tasks?page=1&per_page=20", headers=auth_headers)
-        first_request_time = time.time() - start_time
-        
         assert response1.status_code == 200
         
-        # Second request (cache hit)
-        start_time = time.time()
-        response2 = client.get("/api/cached/tasks?page=1&per_page=20", headers=auth_headers)
-        second_request_time = time.time() - start_time
+        # Repeated requests (cache hits), one latency sample each
+        responses = []
+        hit_times_ns = []
+        for _ in range(20):
+            start_time = time.perf_counter_ns()
+            responses.append(client.get("/api/cached/tasks?page=1&per_page=20", headers=auth_headers))
+            hit_times_ns.append(time.perf_counter_ns() - start_time)
         
-        assert response2.status_code == 200
+        assert all(response.status_code == 200 for response in responses)
         
-        # Cache hit should be significantly faster
-        assert second_request_time < first_request_time * 0.5
+        # Median cache hit should be under 5ms
+        assert statistics.median(hit_times_ns) < 5_000_000
         
         # Responses should be identical
-        assert response1.json() == response2.json()
+        assert all(response.json() == response1.json() for response in responses)
     
-    def test_concurrent_requests_performance(self, client, auth_headers, test_data):
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_performance(self, client, auth_headers, test_data):
         """Test performance under concurrent load"""
         
-        def make_request():
-            response = client.get("/api/tasks?page=1&per_page=10", headers=auth_headers)
-            return response.status_code == 200
-        
-        # Make 10 concurrent requests
-        start_time = time.time()
-        
-        with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-            futures = [executor.submit(make_request) for _ in range(10)]
-            results = [future.result() for future in concurrent.futures.as_completed(futures)]
-        
-        end_time = time.time()
-        total_time = end_time - start_time
+        # 50 requests kept 10 in flight at a time on one event loop, as a real deployment serves them
+        async with httpx.AsyncClient(app=app, base_url="http://testserver") as ac:
+            results = await _driver(ac, "/api/tasks?page=1&per_page=10", auth_headers, n=50, concurrency=10)
         
         # All requests should succeed
-        assert all(results)
+        assert all(status_code == 200 for status_code, _ in results)
         
-        # Should handle concurrent requests efficiently
-        assert total_time < 2.0  # 10 requests in under 2 seconds
+        # Latency percentiles rather than a single wall-clock total
+        cut_points = statistics.quantiles([latency for _, latency in results], n=100)
+        p50, p95, p99 = cut_points[49], cut_points[94], cut_points[98]
         
-        # Average response time should be reasonable
-        avg_response_time = total_time / 10
-        assert avg_response_time < 0.5
+        assert p50 < 0.5
+        assert p95 < 1.0
+        assert p99 < 2.0
     
     def test_analytics_performance(self, client, auth_headers, test_data):
         """Test analytics endpoint performance"""
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         response = client.get("/api/tasks/analytics", headers=auth_headers)
         
-        end_time = time.time()
+        end_time = time.perf_counter()
         response_time = end_time - start_time
         
         assert response.status_code == 200
@@ -206,30 +177,52 @@ class TestAPIPerformance:
         page_sizes = [10, 20, 50]
         
         for page_size in page_sizes:
-            start_time = time.time()
-            
-            response = client.get(f"/api/tasks?page=1&per_page={page_size}", headers=auth_headers)
-            
-            end_time = time.time()
-            response_time = end_time - start_time
+            responses = []
+            response_time = measure(
+                lambda: responses.append(client.get(f"/api/tasks?page=1&per_page={page_size}", headers=auth_headers))
+            )
             
-            assert response.status_code == 200
+            assert all(response.status_code == 200 for response in responses)
             assert response_time < 0.5  # Should be fast regardless of page size
             
-            data = response.json()
+            data = responses[-1].json()
             assert len(data["tasks"]) == page_size
     
     def test_memory_usage_performance(self, client, auth_headers, test_data):
         """Test memory usage during operations"""
         
-        # Make multiple requests and check for memory leaks
-        for i in range(20):
-            response = client.get(f"/api/tasks?page={i % 5 + 1}&per_page=20", headers=auth_headers)
-            assert response.status_code == 200
+        # Warm up so one-off caches (compiled SQL, schema validators) aren't counted
+        client.get("/api/tasks?page=1&per_page=20", headers=auth_headers)
         
-        # Memory usage should remain stable
-        # This is a basic test - in production you'd use more sophisticated memory monitoring
-        assert True  # Placeholder for memory usage validation
+        tracemalloc.start()
+        try:
+            tracemalloc.clear_traces()
+            gc.collect()
+            before = tracemalloc.take_snapshot()
+            
+            # Make multiple requests and check for memory leaks
+            for i in range(20):
+                response = client.get(f"/api/tasks?page={i % 5 + 1}&per_page=20", headers=auth_headers)
+                assert response.status_code == 200
+            
+            gc.collect()
+            after = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+        
+        # TestClient starts a fresh event loop per request; those and pytest's own
+        # allocations belong to the harness, not the app
+        harness = [
+            tracemalloc.Filter(False, "*/uvloop/*"),
+            tracemalloc.Filter(False, "*/_pytest/*"),
+            tracemalloc.Filter(False, tracemalloc.__file__),
+        ]
+        before = before.filter_traces(harness)
+        after = after.filter_traces(harness)
+        
+        # Memory retained across the requests should stay small
+        retained = sum(stat.size_diff for stat in after.compare_to(before, "lineno"))
+        assert retained < 5 * 1024 * 1024  # Under 5MB for 20 requests
 
 class TestDatabasePerformance:
     """Test database query performance"""
@@ -247,7 +240,7 @@ class TestDatabasePerformance:
         ]
         
         for filters in filter_combinations:
-            start_time = time.time()
+            start_time = time.perf_counter()
             
             params = "&".join([f"{k}={v}" for k, v in filters.items()])
             url = f"/api/tasks?page=1&per_page=20"
@@ -256,7 +249,7 @@ class TestDatabasePerformance:
             
             response = client.get(url, headers=auth_headers)
             
-            end_time = time.time()
+            end_time = time.perf_counter()
             response_time = end_time - start_time
             
             assert response.status_code == 200
@@ -269,7 +262,7 @@ class TestDatabasePerformance:
         """Test bulk operations performance"""
         
         # Create multiple tasks quickly
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         created_tasks = []
         for i in range(10):
@@ -285,15 +278,15 @@ class TestDatabasePerformance:
             assert response.status_code == 200
             created_tasks.append(response.json())
         
-        end_time = time.time()
+        end_time = time.perf_counter()
         total_time = end_time - start_time
         
         # Should create 10 tasks quickly
         assert total_time < 2.0
         
-        # Clean up
-        for task in created_tasks:
-            client.delete(f"/api/tasks/{task['id']}", headers=auth_headers)
+        assert len({task["id"] for task in created_tasks}) == 10
+        
+        # No clean up needed: the test's transaction is rolled back in teardown
 
 class TestCachePerformance:
     """Test caching performance"""
@@ -303,23 +296,19 @@ class TestCachePerformance:
         
         # Make multiple identical requests
         requests_made = 10
-        cache_hits = 0
+        response_times = []
         
         for i in range(requests_made):
-            start_time = time.time()
+            start_time = time.perf_counter()
             response = client.get("/api/cached/tasks?page=1&per_page=20", headers=auth_headers)
-            response_time = time.time() - start_time
+            response_times.append(time.perf_counter() - start_time)
             
             assert response.status_code == 200
-            
-            # First request should be slower (cache miss), subsequent should be faster (cache hit)
-            if i == 0:
-                # First request - cache miss
-                assert response_time > 0.1
-            else:
-                # Subsequent requests - cache hits
-                if response_time < 0.05:  # Very fast response indicates cache hit
-                    cache_hits += 1
+        
+        # First request is the cache miss; hits are judged relative to it, not to a fixed
+        # threshold, so a warm first request doesn't make the test flaky
+        first_request_time = response_times[0]
+        cache_hits = sum(1 for response_time in response_times[1:] if response_time < first_request_time)
         
         # Should have good cache hit ratio
         cache_hit_ratio = cache_hits / (requests_made - 1)
@@ -1,357 +1,390 @@
+import asyncio
+import httpx
+import orjson
 import pytest
-from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
-from core.database import get_db, Base
+import pytest_asyncio
+from fastapi import Depends, HTTPException, status
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session
+from core.database import get_db
 from main import app
 from models.user import User
 from models.task import Task, Category
-from api.auth import get_password_hash, create_access_token
+from api.auth import get_current_user, oauth2_scheme
 
-# Test database setup
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
-)
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+pytestmark = pytest.mark.asyncio
 
-def override_get_db():
-    try:
-        db = TestingSessionLocal()
-        yield db
-    finally:
-        db.close()
+@pytest.fixture(scope="module")
+def event_loop():
+    # One loop for the module, so the shared AsyncClient outlives individual tests
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
 
-app.dependency_overrides[get_db] = override_get_db
+@pytest_asyncio.fixture(scope="module")
+async def _client():
+    # Requests go straight to the app on the test's event loop, no per-request worker thread or portal
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
 
 @pytest.fixture
-def client():
-    Base.metadata.create_all(bind=engine)
-    yield TestClient(app)
-    Base.metadata.drop_all(bind=engine)
+def client(_client, db_session):
+    """Async client whose requests share conftest's db_session, so fixture rows need no commit"""
+    # No close here: the rolled-back test transaction cleans up after the shared session
+    def override_get_db():
+        yield db_session
 
-@pytest.fixture
-def db_session():
-    session = TestingSessionLocal()
-    yield session
+    app.dependency_overrides[get_db] = override_get_db
+    yield _client
+    app.dependency_overrides.pop(get_db, None)
+
+@pytest.fixture(scope="module")
+def test_category(database, test_user):
+    """Committed like conftest's test_user; tests that edit or delete it do so inside their rolled-back transaction"""
+    session = Session(database, expire_on_commit=False)
+    category = session.execute(
+        insert(Category).values(
+            name="Work",
+            color="#3498db",
+            user_id=test_user.id
+        ).returning(Category)
+    ).scalar_one()
+    session.commit()
+    yield category
+    # The schema is shared with the other test modules, so don't leave the category behind
+    session.delete(category)
+    session.commit()
     session.close()
 
 @pytest.fixture
-def test_user(db_session):
-    user = User(
-        email="test@example.com",
-        hashed_password=get_password_hash("password123"),
-        full_name="Test User",
-        is_active=True
-    )
-    db_session.add(user)
-    db_session.commit()
-    db_session.refresh(user)
+def test_task(db_session, test_user, test_category):
+    # Requests share db_session, so the returned row is visible to them without a commit
+    return db_session.execute(
+        insert(Task).values(
+            title="Test Task",
+            description="Test Description",
+            status="todo",
+            priority="medium",
+            category_id=test_category.id,
+            user_id=test_user.id
+        ).returning(Task)
+    ).scalar_one()
+
+# Opaque tokens accepted in place of JWTs, so no signing or verification runs on the request path
+_TEST_TOKEN_PREFIX = "test-token::"
+
+async def _get_current_user_from_test_token(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    user = None
+    if token.startswith(_TEST_TOKEN_PREFIX):
+        user = db.query(User).filter(User.email == token[len(_TEST_TOKEN_PREFIX):]).first()
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
 
-@pytest.fixture
-def test_category(db_session, test_user):
-    category = Category(
-        name="Work",
-        color="#3498db",
-        user_id=test_user.id
-    )
-    db_session.add(category)
-    db_session.commit()
-    db_session.refresh(category)
-    return category
+@pytest.fixture(scope="module", autouse=True)
+def _test_token_auth():
+    app.dependency_overrides[get_current_user] = _get_current_user_from_test_token
+    yield
+    app.dependency_overrides.pop(get_current_user, None)
 
-@pytest.fixture
-def test_task(db_session, test_user, test_category):
-    task = Task(
-        title="Test Task",
-        description="Test Description",
-        status="todo",
-        priority="medium",
-        category_id=test_category.id,
-        user_id=test_user.id
-    )
-    db_session.add(task)
-    db_session.commit()
-    db_session.refresh(task)
-    return task
+@pytest.fixture(scope="module")
+def auth_headers(test_user):
+    return {"Authorization": f"Bearer {_TEST_TOKEN_PREFIX}{test_user.email}"}
+
+# Request bodies serialized once and sent as-is with content=
+_NEW_TASK = {
+    "title": "New Task",
+    "description": "New Description",
+    "status": "todo",
+    "priority": "medium"
+}
+_INVALID_TASK_BODY = orjson.dumps({**_NEW_TASK, "title": ""})  # Empty title should fail
+_UPDATED_TASK = {
+    "title": "Updated Task",
+    "description": "Updated Description",
+    "status": "in_progress",
+    "priority": "high"
+}
+_JSON_HEADERS = {"content-type": "application/json"}
+
+# Keys every response of these shapes must carry
+_TASK_LIST_KEYS = frozenset({"tasks", "total", "page", "per_page"})
+_ANALYTICS_KEYS = frozenset({
+    "total_tasks", "completed_tasks", "pending_tasks", "in_progress_tasks",
+    "completion_rate", "tasks_by_priority", "tasks_by_category"
+})
+
+@pytest.fixture(scope="module")
+def new_task_body(test_category):
+    return orjson.dumps({**_NEW_TASK, "category_id": test_category.id})
+
+@pytest.fixture(scope="module")
+def json_auth_headers(auth_headers):
+    return {**auth_headers, **_JSON_HEADERS}
+
+def _ok(response, status_code=200):
+    """Assert the status (showing the body on failure) and return the decoded JSON"""
+    assert response.status_code == status_code, response.text
+    return response.json()
 
 @pytest.fixture
-def auth_headers(test_user):
-    token = create_access_token({"sub": test_user.email})
-    return {"Authorization": f"Bearer {token}"}
+def query_counter(database):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        # The shared test session's SAVEPOINT bookkeeping is not part of what the endpoint queries
+        if not statement.startswith(("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")):
+            statements.append(statement)
+
+    event.listen(database, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(database, "before_cursor_execute", before_cursor_execute)
 
 class TestTaskEndpoints:
-    def test_create_task_success(self, client, auth_headers, test_category):
-        task_data = {
-            "title": "New Task",
-            "description": "New Description",
-            "status": "todo",
-            "priority": "medium",
-            "category_id": test_category.id
-        }
+    async def test_create_task_success(self, client, json_auth_headers, new_task_body, test_category):
+        response = await client.post("/api/tasks", content=new_task_body, headers=json_auth_headers)
         
-        response = client.post("/api/tasks", json=task_data, headers=auth_headers)
-        
-        assert response.status_code == 200
-        data = response.json()
+        data = _ok(response)
         assert data["title"] == "New Task"
         assert data["description"] == "New Description"
         assert data["status"] == "todo"
         assert data["priority"] == "medium"
         assert data["category_id"] == test_category.id
         
-    def test_create_task_unauthorized(self, client, test_category):
-        task_data = {
-            "title": "New Task",
-            "description": "New Description",
-            "status": "todo",
-            "priority": "medium",
-            "category_id": test_category.id
-        }
-        
-        response = client.post("/api/tasks", json=task_data)
-        
-        assert response.status_code == 401
-        
-    def test_create_task_invalid_data(self, client, auth_headers):
-        task_data = {
-            "title": "",  # Empty title should fail
-            "description": "New Description",
-            "status": "todo",
-            "priority": "medium"
-        }
-        
-        response = client.post("/api/tasks", json=task_data, headers=auth_headers)
+    async def test_create_task_invalid_data(self, client, json_auth_headers):
+        response = await client.post("/api/tasks", content=_INVALID_TASK_BODY, headers=json_auth_headers)
         
         assert response.status_code == 422
         
-    def test_get_tasks_success(self, client, auth_headers, test_task):
-        response = client.get("/api/tasks", headers=auth_headers)
+    async def test_get_tasks_success(self, client, auth_headers, test_task):
+        response = await client.get("/api/tasks", headers=auth_headers)
         
-        assert response.status_code == 200
-        data = response.json()
-        assert "tasks" in data
-        assert "total" in data
-        assert "page" in data
-        assert "per_page" in data
+        data = _ok(response)
+        assert _TASK_LIST_KEYS <= data.keys()
         assert len(data["tasks"]) == 1
         assert data["tasks"][0]["title"] == "Test Task"
         
-    def test_get_tasks_with_filters(self, client, auth_headers, test_task):
-        response = client.get("/api/tasks?status=todo&priority=medium", headers=auth_headers)
+    async def test_get_tasks_with_filters(self, client, auth_headers, test_task):
+        response = await client.get("/api/tasks?status=todo&priority=medium", headers=auth_headers)
         
-        assert response.status_code == 200
-        data = response.json()
+        data = _ok(response)
         assert len(data["tasks"]) == 1
         
-    def test_get_tasks_empty_filters(self, client, auth_headers, test_task):
-        response = client.get("/api/tasks?status=done", headers=auth_headers)
+    async def test_get_tasks_empty_filters(self, client, auth_headers, test_task):
+        response = await client.get("/api/tasks?status=done", headers=auth_headers)
         
-        assert response.status_code == 200
-        data = response.json()
+        data = _ok(response)
         assert len(data["tasks"]) == 0
         
-    def test_get_task_by_id_success(self, client, auth_headers, test_task):
-        response = client.get(f"/api/tasks/{test_task.id}", headers=auth_headers)
+    async def test_get_task_by_id_success(self, client, auth_headers, test_task):
+        response = await client.get(f"/api/tasks/{test_task.id}", headers=auth_headers)
         
-        assert response.status_code == 200
-        data = response.json()
+        data = _ok(response)
         assert data["id"] == test_task.id
         assert data["title"] == "Test Task"
         
-    def test_get_task_by_id_not_found(self, client, auth_headers):
-        response = client.get("/api/tasks/999", headers=auth_headers)
-        
-        assert response.status_code == 404
-        
-    def test_get_task_by_id_unauthorized(self, client, test_task):
-        response = client.get(f"/api/tasks/{test_task.id}")
-        
-        assert response.status_code == 401
+    async def test_update_task_success(self, client, auth_headers, test_task):
+        response = await client.put(f"/api/tasks/{test_task.id}", json=_UPDATED_TASK, headers=auth_headers)
         
-    def test_update_task_success(self, client, auth_headers, test_task):
-        update_data = {
-            "title": "Updated Task",
-            "description": "Updated Description",
-            "status": "in_progress",
-            "priority": "high"
-        }
-        
-        response = client.put(f"/api/tasks/{test_task.id}", json=update_data, headers=auth_headers)
-        
-        assert response.status_code == 200
-        data = response.json()
+        data = _ok(response)
         assert data["title"] == "Updated Task"
         assert data["description"] == "Updated Description"
         assert data["status"] == "in_progress"
         assert data["priority"] == "high"
         
-    def test_update_task_not_found(self, client, auth_headers):
-        update_data = {
-            "title": "Updated Task",
-            "description": "Updated Description",
-            "status": "in_progress",
-            "priority": "high"
-        }
-        
-        response = client.put("/api/tasks/999", json=update_data, headers=auth_headers)
-        
-        assert response.status_code == 404
-        
-    def test_delete_task_success(self, client, auth_headers, test_task):
-        response = client.delete(f"/api/tasks/{test_task.id}", headers=auth_headers)
-        
-        assert response.status_code == 200
-        assert "deleted successfully" in response.json()["message"].lower()
-        
-    def test_delete_task_not_found(self, client, auth_headers):
-        response = client.delete("/api/tasks/999", headers=auth_headers)
-        
-        assert response.status_code == 404
-        
-    def test_get_task_analytics_success(self, client, auth_headers, test_task):
-        response = client.get("/api/analytics", headers=auth_headers)
+    async def test_delete_task_success(self, client, auth_headers, test_task):
+        response = await client.delete(f"/api/tasks/{test_task.id}", headers=auth_headers)
         
         assert response.status_code == 200
-        data = response.json()
-        assert "total_tasks" in data
-        assert "completed_tasks" in data
-        assert "pending_tasks" in data
-        assert "in_progress_tasks" in data
-        assert "completion_rate" in data
-        assert "tasks_by_priority" in data
-        assert "tasks_by_category" in data
+        assert b"deleted successfully" in response.content.lower()
+        
+    @pytest.mark.parametrize("method,path,authenticated,body,expected_status", [
+        ("post", "/api/tasks", False, _NEW_TASK, 401),
+        ("get", "/api/tasks/{task_id}", False, None, 401),
+        ("get", "/api/tasks/999", True, None, 404),
+        ("put", "/api/tasks/999", True, _UPDATED_TASK, 404),
+        ("delete", "/api/tasks/999", True, None, 404),
+    ])
+    async def test_task_error_paths(self, client, auth_headers, test_task, method, path, authenticated, body, expected_status):
+        response = await client.request(
+            method,
+            path.format(task_id=test_task.id),
+            json=body,
+            headers=auth_headers if authenticated else None
+        )
+        
+        assert response.status_code == expected_status
+        
+    async def test_get_task_analytics_success(self, client, auth_headers, test_task):
+        response = await client.get("/api/analytics", headers=auth_headers)
+        
+        data = _ok(response)
+        assert _ANALYTICS_KEYS <= data.keys()
 
 class TestCategoryEndpoints:
-    def test_create_category_success(self, client, auth_headers):
+    async def test_create_category_success(self, client, auth_headers):
         category_data = {
             "name": "Personal",
             "color": "#e74c3c"
         }
         
-        response = client.post("/api/categories", json=category_data, headers=auth_headers)
+        response = await client.post("/api/categories", json=category_data, headers=auth_headers)
         
-        assert response.status_code == 200
-        data = response.json()
+        data = _ok(response)
         assert data["name"] == "Personal"
         assert data["color"] == "#e74c3c"
         
-    def test_create_category_duplicate_name(self, client, auth_headers, test_category):
+    async def test_create_category_duplicate_name(self, client, auth_headers, test_category):
         category_data = {
             "name": "Work",  # Same name as test_category
             "color": "#e74c3c"
         }
         
-        response = client.post("/api/categories", json=category_data, headers=auth_headers)
+        response = await client.post("/api/categories", json=category_data, headers=auth_headers)
         
         assert response.status_code == 400
-        assert "category with this name already exists" in response.json()["detail"].lower()
+        assert b"category with this name already exists" in response.content.lower()
         
-    def test_get_categories_success(self, client, auth_headers, test_category):
-        response = client.get("/api/categories", headers=auth_headers)
+    async def test_get_categories_success(self, client, auth_headers, test_category):
+        response = await client.get("/api/categories", headers=auth_headers)
         
-        assert response.status_code == 200
-        data = response.json()
+        data = _ok(response)
         assert len(data) == 1
         assert data[0]["name"] == "Work"
         
-    def test_update_category_success(self, client, auth_headers, test_category):
+    async def test_update_category_success(self, client, auth_headers, test_category):
         update_data = {
             "name": "Updated Work",
             "color": "#2ecc71"
         }
         
-        response = client.put(f"/api/categories/{test_category.id}", json=update_data, headers=auth_headers)
+        response = await client.put(f"/api/categories/{test_category.id}", json=update_data, headers=auth_headers)
         
-        assert response.status_code == 200
-        data = response.json()
+        data = _ok(response)
         assert data["name"] == "Updated Work"
         assert data["color"] == "#2ecc71"
         
-    def test_delete_category_success(self, client, auth_headers, test_category):
-        response = client.delete(f"/api/categories/{test_category.id}", headers=auth_headers)
+    async def test_delete_category_success(self, client, auth_headers, test_category):
+        response = await client.delete(f"/api/categories/{test_category.id}", headers=auth_headers)
         
         assert response.status_code == 200
-        assert "deleted successfully" in response.json()["message"].lower()
+        assert b"deleted successfully" in response.content.lower()
         
-    def test_delete_category_with_tasks(self, client, auth_headers, test_category, test_task):
-        response = client.delete(f"/api/categories/{test_category.id}", headers=auth_headers)
+    async def test_delete_category_with_tasks(self, client, auth_headers, test_category, test_task):
+        response = await client.delete(f"/api/categories/{test_category.id}", headers=auth_headers)
         
         assert response.status_code == 400
-        assert "cannot delete category with existing tasks" in response.json()["detail"].lower()
+        assert b"cannot delete category with existing tasks" in response.content.lower()
 
 class TestTaskValidation:
-    def test_task_status_validation(self, client, auth_headers, test_category):
-        task_data = {
-            "title": "Test Task",
-            "description": "Test Description",
-            "status": "invalid_status",  # Invalid status
-            "priority": "medium",
-            "category_id": test_category.id
-        }
-        
-        response = client.post("/api/tasks", json=task_data, headers=auth_headers)
-        
-        assert response.status_code == 422
-        
-    def test_task_priority_validation(self, client, auth_headers, test_category):
-        task_data = {
-            "title": "Test Task",
-            "description": "Test Description",
-            "status": "todo",
-            "priority": "invalid_priority",  # Invalid priority
-            "category_id": test_category.id
-        }
-        
-        response = client.post("/api/tasks", json=task_data, headers=auth_headers)
-        
-        assert response.status_code == 422
-        
-    def test_task_category_validation(self, client, auth_headers):
+    @pytest.mark.parametrize("field,value,expected_status,expected_detail", [
+        ("status", "invalid_status", 422, None),
+        ("priority", "invalid_priority", 422, None),
+        ("category_id", 999, 400, b"category not found"),  # Non-existent category
+    ])
+    async def test_task_field_validation(self, client, auth_headers, test_category, field, value, expected_status, expected_detail):
         task_data = {
             "title": "Test Task",
             "description": "Test Description",
             "status": "todo",
             "priority": "medium",
-            "category_id": 999  # Non-existent category
+            "category_id": test_category.id
         }
+        task_data[field] = value
         
-        response = client.post("/api/tasks", json=task_data, headers=auth_headers)
+        response = await client.post("/api/tasks", json=task_data, headers=auth_headers)
         
-        assert response.status_code == 400
-        assert "category not found" in response.json()["detail"].lower()
+        assert response.status_code == expected_status
+        if expected_detail:
+            assert expected_detail in response.content.lower()
 
 class TestTaskPagination:
-    def test_task_pagination(self, client, auth_headers, test_category, db_session, test_user):
-        # Create multiple tasks
-        for i in range(15):
-            task = Task(
-                title=f"Task {i}",
-                description=f"Description {i}",
-                status="todo",
-                priority="medium",
-                category_id=test_category.id,
-                user_id=test_user.id
-            )
-            db_session.add(task)
-        db_session.commit()
+    async def test_task_pagination(self, client, auth_headers, test_category, db_session, test_user):
+        # Create multiple tasks with one executemany INSERT; requests share db_session, so no commit
+        db_session.execute(Task.__table__.insert(), [
+            {
+                "title": f"Task {i}",
+                "description": f"Description {i}",
+                "status": "todo",
+                "priority": "medium",
+                "category_id": test_category.id,
+                "user_id": test_user.id
+            }
+            for i in range(15)
+        ])
         
         # Test first page
-        response = client.get("/api/tasks?page=1&per_page=10", headers=auth_headers)
-        assert response.status_code == 200
-        data = response.json()
+        response = await client.get("/api/tasks?page=1&per_page=10", headers=auth_headers)
+        data = _ok(response)
         assert len(data["tasks"]) == 10
         assert data["page"] == 1
         assert data["per_page"] == 10
         assert data["total"] == 15
         
         # Test second page
-        response = client.get("/api/tasks?page=2&per_page=10", headers=auth_headers)
-        assert response.status_code == 200
-        data = response.json()
+        response = await client.get("/api/tasks?page=2&per_page=10", headers=auth_headers)
+        data = _ok(response)
         assert len(data["tasks"]) == 5
         assert data["page"] == 2
+
+    async def test_task_list_query_count(self, client, auth_headers, test_category, db_session, test_user, query_counter):
+        db_session.execute(Task.__table__.insert(), [
+            {"title": f"Task {i}", "category_id": test_category.id, "user_id": test_user.id} for i in range(15)
+        ])
+        query_counter.clear()
+
+        response = await client.get("/api/tasks?page=1&size=10", headers=auth_headers)
+        assert len(_ok(response)["tasks"]) == 10
+        # User lookup, total count, one page select with categories joined in
+        assert len(query_counter) <= 3
+
+class TestTaskDependencies:
+    async def test_create_dependency_duplicate_pair(self, client, auth_headers, db_session, test_user, test_category, test_task):
+        blocking_task = db_session.execute(
+            insert(Task).values(
+                title="Blocking Task",
+                category_id=test_category.id,
+                user_id=test_user.id
+            ).returning(Task)
+        ).scalar_one()
+        dependency_data = {"task_id": test_task.id, "depends_on_task_id": blocking_task.id}
+        
+        response = await client.post("/api/advanced/dependencies", json=dependency_data, headers=auth_headers)
+        data = _ok(response)
+        assert data["task_id"] == test_task.id
+        assert data["depends_on_task_id"] == blocking_task.id
+        
+        # The same pair again hits uq_task_dep
+        response = await client.post("/api/advanced/dependencies", json=dependency_data, headers=auth_headers)
+        assert response.status_code == 400
+        assert b"dependency already exists" in response.content.lower()
+
+class TestTaskSearch:
+    async def test_search_filters_by_status_and_priority(self, client, auth_headers, db_session, test_user, test_category):
+        db_session.execute(Task.__table__.insert(), [
+            {"title": title, "status": status, "priority": priority,
+             "category_id": test_category.id, "user_id": test_user.id}
+            for title, status, priority in [
+                ("Todo high", "todo", "high"),
+                ("Todo low", "todo", "low"),
+                ("Done high", "done", "high"),
+                ("In progress urgent", "in_progress", "urgent"),
+            ]
+        ])
+        
+        response = await client.post(
+            "/api/advanced/tasks/search",
+            json={"status": ["todo", "in_progress"], "priority": ["high", "urgent"]},
+            headers=auth_headers
+        )
+        data = _ok(response)
+        assert data["total"] == 2
+        assert {task["title"] for task in data["tasks"]} == {"Todo high", "In progress urgent"}
+        
+        # Values outside the enums are rejected by the request schema
+        response = await client.post("/api/advanced/tasks/search", json={"status": ["archived"]}, headers=auth_headers)
+        assert response.status_code == 422
@@ -0,0 +1,137 @@
+import asyncio
+import time
+from types import SimpleNamespace
+import orjson
+import pytest
+import pytest_asyncio
+from core import websocket_service
+from core.websocket_service import ConnectionManager, COALESCE_WINDOW_SECONDS, PING_INTERVAL_SECONDS
+
+pytestmark = pytest.mark.asyncio
+
+
+class FakeWebSocket:
+    """Records every frame the writer sends"""
+    def __init__(self):
+        self.frames = []
+
+    async def accept(self):
+        pass
+
+    async def send_bytes(self, payload: bytes):
+        self.frames.append(orjson.loads(payload))
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fake monotonic clock for the module only; the event loop keeps the real one"""
+    fake = SimpleNamespace(now=0.0)
+    monkeypatch.setattr(websocket_service, "time", SimpleNamespace(
+        monotonic=lambda: fake.now,
+        monotonic_ns=time.monotonic_ns
+    ))
+    return fake
+
+@pytest_asyncio.fixture
+async def manager():
+    manager = ConnectionManager()
+    yield manager
+    for websocket in list(manager.connection_metadata):
+        manager.disconnect(websocket)
+
+async def _drain():
+    """Let the writer tasks send whatever is queued"""
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+async def _connect(manager, connection_type="tasks"):
+    websocket = FakeWebSocket()
+    await manager.connect(websocket, user_id=1, connection_type=connection_type)
+    await _drain()
+    websocket.frames.clear()  # connection_established
+    return websocket
+
+class TestPing:
+    async def test_idle_socket_pinged_every_pass(self, manager, clock):
+        websocket = await _connect(manager)
+        
+        for _ in range(3):
+            clock.now += PING_INTERVAL_SECONDS
+            await manager.ping_connections()
+            await _drain()
+        
+        assert [frame["type"] for frame in websocket.frames] == ["ping"] * 3
+
+    async def test_recently_active_socket_skipped(self, manager, clock):
+        websocket = await _connect(manager)
+        last_ping = manager.connection_metadata[websocket].last_ping
+        
+        clock.now += 1
+        await manager.ping_connections()
+        await _drain()
+        
+        assert websocket.frames == []
+        assert manager.connection_metadata[websocket].last_ping == last_ping
+
+class TestCoalescing:
+    async def test_burst_sent_as_one_array_frame(self, manager):
+        websocket = await _connect(manager)
+        
+        await manager.send_task_update(1, {"id": 1})
+        await manager.send_task_update(1, {"id": 2})
+        await manager.send_task_update(1, {"id": 3})
+        await _drain()
+        assert websocket.frames == []
+        
+        await asyncio.sleep(COALESCE_WINDOW_SECONDS * 2)
+        await _drain()
+        
+        assert len(websocket.frames) == 1
+        frame = websocket.frames[0]
+        assert [message["type"] for message in frame] == ["task_update"] * 3
+        assert [message["data"]["id"] for message in frame] == [1, 2, 3]
+
+    async def test_only_matching_connection_type_receives_update(self, manager):
+        tasks = await _connect(manager, "tasks")
+        notifications = await _connect(manager, "notifications")
+        
+        await manager.send_notification(1, {"message": "hi"})
+        manager.flush_now(notifications)
+        manager.flush_now(tasks)
+        await _drain()
+        
+        assert tasks.frames == []
+        assert [message["type"] for message in notifications.frames[0]] == ["notification"]
+
+    async def test_flush_now_cancels_pending_handle(self, manager):
+        websocket = await _connect(manager, "analytics")
+        metadata = manager.connection_metadata[websocket]
+        
+        await manager.send_analytics_update(1, {"total_tasks": 1})
+        handle = metadata.flush_handle
+        manager.flush_now(websocket)
+        await _drain()
+        
+        assert handle.cancelled()
+        assert metadata.flush_handle is None
+        assert metadata.pending == []
+        assert len(websocket.frames) == 1
+        
+        # The cancelled timer must not send a second, empty frame
+        await asyncio.sleep(COALESCE_WINDOW_SECONDS * 2)
+        await _drain()
+        assert len(websocket.frames) == 1
+
+    async def test_disconnect_during_pending_flush(self, manager):
+        websocket = await _connect(manager)
+        
+        await manager.send_task_update(1, {"id": 1})
+        handle = manager.connection_metadata[websocket].flush_handle
+        manager.disconnect(websocket)
+        
+        assert handle.cancelled()
+        assert websocket not in manager.connection_metadata
+        
+        await asyncio.sleep(COALESCE_WINDOW_SECONDS * 2)
+        await _drain()
+        assert websocket.frames == []